@@ -0,0 +1,100 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional
+
+def initial_state(clause: Dict[str, Any], namespace: str, critic_finding: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Builds the AgentState a clause audit starts from.
+    A prefilled critic_finding (e.g. from AuditWorkflow.critic_batch) counts as the first attempt.
+    """
+    return {
+        "clause": clause,
+        "contract_namespace": namespace,
+        "critic_finding": critic_finding,
+        "verification_result": None,
+        "attempts": 1 if critic_finding else 0,
+        "final_output": None
+    }
+
+# Called as on_finding(clause_position, finding, verification) as soon as each clause's audit
+# completes; verification is the Reflector's last verdict on the finding
+FindingCallback = Callable[[int, Dict[str, Any], Optional[Dict[str, Any]]], None]
+
+def audit_clauses(app, clauses: List[Dict[str, Any]], namespace: str, prefilled: Optional[List[Optional[Dict[str, Any]]]] = None, on_finding: Optional[FindingCallback] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Runs the compiled critic/reflector graph over each clause, one at a time.
+
+    Returns:
+        One finding per clause, in clause order (None where the audit failed).
+    """
+    findings = []
+    for i, clause in enumerate(clauses):
+        print(f"Analyzing Clause {clause['clause_id']} ({i+1}/{len(clauses)})...")
+        try:
+            # Run the LangGraph; critic_finding is the last critic output
+            final_state = app.invoke(initial_state(clause, namespace, prefilled[i] if prefilled else None))
+            findings.append(final_state.get('critic_finding'))
+            if on_finding and findings[-1]:
+                on_finding(i, findings[-1], final_state.get('verification_result'))
+        except Exception as e:
+            print(f"Error auditing clause {clause['clause_id']}: {e}")
+            findings.append(None)
+    return findings
+
+async def audit_clauses_async(app, clauses: List[Dict[str, Any]], namespace: str, concurrency: int = 8, prefilled: Optional[List[Optional[Dict[str, Any]]]] = None, on_finding: Optional[FindingCallback] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Audits clauses concurrently through the graph's async invocation.
+
+    At most `concurrency` clauses are in flight; request/token budgets are enforced by the
+    RateLimiter shared through AuditWorkflow. The graph's nodes are synchronous, so LangGraph
+    runs them on the loop's default executor, which is sized to match.
+
+    Returns:
+        One finding per clause, in clause order (None where the audit failed).
+    """
+    states = [initial_state(clause, namespace, prefilled[i] if prefilled else None) for i, clause in enumerate(clauses)]
+    return await audit_states_async(app, states, concurrency, on_finding)
+
+async def audit_states_async(app, states: List[Dict[str, Any]], concurrency: int = 8, on_finding: Optional[FindingCallback] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Runs prepared initial states through the graph from one shared queue.
+    States may belong to different contracts (each carries its own contract_namespace),
+    which lets a batch of contracts share one concurrency budget.
+
+    Returns:
+        One finding per state, in input order (None where the audit failed).
+    """
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    loop.set_default_executor(executor)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(i: int, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        clause_id = state['clause']['clause_id']
+        async with semaphore:
+            print(f"Analyzing Clause {clause_id} ({i+1}/{len(states)})...")
+            try:
+                final_state = await app.ainvoke(state)
+            except Exception as e:
+                print(f"Error auditing clause {clause_id}: {e}")
+                return None
+            finding = final_state.get('critic_finding')
+            if on_finding and finding:
+                on_finding(i, finding, final_state.get('verification_result'))
+            return finding
+
+    try:
+        # gather() returns results in submission order, so findings stay in clause order
+        return await asyncio.gather(*(run_one(i, state) for i, state in enumerate(states)))
+    finally:
+        executor.shutdown(wait=False)
+
+def run_audit(app, clauses: List[Dict[str, Any]], namespace: str, concurrency: int = 1, prefilled: Optional[List[Optional[Dict[str, Any]]]] = None, on_finding: Optional[FindingCallback] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Audits clauses serially, or concurrently when concurrency > 1.
+    `prefilled` optionally holds a first critic finding per clause (aligned with `clauses`);
+    `on_finding` is notified of each finding as soon as it is produced.
+    """
+    if concurrency > 1:
+        return asyncio.run(audit_clauses_async(app, clauses, namespace, concurrency, prefilled, on_finding))
+    return audit_clauses(app, clauses, namespace, prefilled, on_finding)
@@ -0,0 +1,73 @@
+import json
+import os
+import threading
+from typing import List, Dict, Any, Optional
+from src.analysis.incremental import clause_hash
+from src.utils.paths import cache_dir
+
+class AuditCheckpoint:
+    """
+    Durable per-clause log of completed audits for one contract version.
+
+    Each finding is appended as one JSON line and fsync'ed before the audit moves on, so a
+    crashed run can be resumed without paying again for clauses that already finished.
+    Entries are keyed by clause position and content hash; a torn last line is ignored.
+    """
+    def __init__(self, namespace: str, pdf_hash: str, resume: bool = True):
+        self.path = self.path_for(namespace, pdf_hash)
+        self._done: Dict[int, Dict[str, Any]] = {}
+        self._torn = False
+        if resume and os.path.exists(self.path):
+            self._load()
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+        if self._torn:
+            # Start fresh records on their own line after a partially written one
+            self._file.write("\n")
+
+    @staticmethod
+    def path_for(namespace: str, pdf_hash: str) -> str:
+        return os.path.join(cache_dir("checkpoints"), f"{namespace}_{pdf_hash[:16]}.jsonl")
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                self._torn = not line.endswith("\n")
+                try:
+                    entry = json.loads(line)
+                    self._done[entry["position"]] = entry
+                except (ValueError, KeyError):
+                    continue
+
+    def completed(self, clauses: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Returns the checkpointed finding for each clause, or None where it still has to be audited.
+        Clauses whose text no longer matches the checkpoint entry are audited again.
+        """
+        results = []
+        for position, clause in enumerate(clauses):
+            entry = self._done.get(position)
+            if entry and entry["content_hash"] == clause_hash(clause):
+                results.append(entry["finding"])
+            else:
+                results.append(None)
+        return results
+
+    def record(self, position: int, clause: Dict[str, Any], finding: Dict[str, Any]):
+        """Durably records a finished clause. Failed audits are not recorded, so they are retried."""
+        if finding.get("status") == "ERROR":
+            return
+        line = json.dumps({"position": position, "content_hash": clause_hash(clause), "finding": finding}, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+    def discard(self):
+        """Closes and deletes the checkpoint once the run's results are safely saved elsewhere."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -1,8 +1,12 @@
-from typing import Dict, Any, Optional
-from pydantic import BaseModel, Field
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from pydantic import BaseModel, Field, ValidationError
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
+from langchain_core.language_models import BaseChatModel
 from langchain_core.output_parsers import JsonOutputParser
+from src.utils.llm_cache import LLMResponseCache, cached_invoke
+from src.utils.rate_limiter import RateLimiter, estimate_tokens
+from src.utils.llm_provider import get_provider
 
 # Define the Output Schema
 class CriticOutput(BaseModel):
@@ -13,8 +17,22 @@ class CriticOutput(BaseModel):
     source_verification: str = Field(description="The exact quote from the contract text that supports this finding. MUST be creating verbatum.")
 
 class CriticAgent:
-    def __init__(self, model_name: str = "gpt-4o"):
-        self.llm = ChatOpenAI(model=model_name, temperature=0)
+    # Bump when a prompt changes so cached responses for the old prompt are not reused
+    PROMPT_VERSION = "critic-v1"
+    BATCH_PROMPT_VERSION = "critic-batch-v1"
+    # System prompt, law context and the JSON answer, on top of the clause text itself
+    TOKEN_OVERHEAD = 700
+
+    def __init__(self, model_name: str = "gpt-4o", cache: Optional[LLMResponseCache] = None, rate_limiter: Optional[RateLimiter] = None, llm: Optional[BaseChatModel] = None):
+        self.model_name = model_name
+        # `llm` substitutes another chat model (e.g. the benchmark's stand-in) for `model_name` on OpenAI
+        self.llm = llm or get_provider().chat(model_name, temperature=0)
+        self.cache = cache
+        # Only charged for calls that actually reach the API (cache misses)
+        self.rate_limiter = rate_limiter
+        # Cache key of the batch response each batch-sourced finding came from, so forget() can evict it
+        self._batch_keys: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
         self.parser = JsonOutputParser(pydantic_object=CriticOutput)
         
         self.prompt = ChatPromptTemplate.from_messages([
@@ -41,25 +59,49 @@ class CriticAgent:
         ])
         
         self.chain = self.prompt | self.llm | self.parser
+        
+        # Several clauses per call: the system prompt is paid once per batch instead of per clause
+        self.batch_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are an expert Legal Auditor specializing in UAE Law.
+            Your task is to review several contract clauses for compliance, each one independently.
+            
+            You must output a JSON object {{"findings": [...]}} with exactly one entry per clause, each with:
+            - item: The item number given for the clause.
+            - clause_id: The ID provided.
+            - status: COMPLIANT, VIOLATION, or MISSING (if a required clause is absent).
+            - law_reference: Cite the specific UAE law.
+            - reasoning: Explain your decision.
+            - source_verification: Copy the EXACT text from that clause that you used to make this decision. This is CRITICAL for hallucination checking.
+            
+            If a clause is compliant, verify it against standard UAE norms.
+            If a clause is a violation, explain exactly why based on the provided 'Relevant Laws'.
+            """),
+            ("user", """
+            {clauses}
+            
+            Relevant Laws (Retrieved):
+            {relevant_laws}
+            """)
+        ])
+        
+        self.batch_chain = self.batch_prompt | self.llm | JsonOutputParser()
 
-    def evaluate_clause(self, clause_data: Dict[str, Any], relevant_laws: str = "Standard UAE Contract Law principles apply.") -> Dict[str, Any]:
+    def evaluate_clause(self, clause_data: Dict[str, Any], relevant_laws: str = "Standard UAE Contract Law principles apply.", refresh: bool = False) -> Dict[str, Any]:
         """
         Evaluates a single clause.
         
         Args:
             clause_data: Dict containing 'clause_id' and 'raw_text'.
             relevant_laws: Context retrieved from the Law Vector DB.
+            refresh: Ask the model again instead of reusing a cached answer, e.g. on a
+                     retry after the Reflector rejected the previous one.
             
         Returns:
             Dict matching CriticOutput schema.
         """
+        inputs = self._clause_inputs(clause_data, relevant_laws)
         try:
-            result = self.chain.invoke({
-                "clause_id": clause_data.get("clause_id", "unknown"),
-                "clause_text": clause_data.get("raw_text", ""),
-                "relevant_laws": relevant_laws
-            })
-            return result
+            return self._invoke(self.chain, self.PROMPT_VERSION, inputs, items=1, refresh=refresh)
         except Exception as e:
             print(f"Error in Critic Agent: {e}")
             return {
@@ -69,6 +111,124 @@ class CriticAgent:
                 "source_verification": ""
             }
 
+    def forget(self, clause_data: Dict[str, Any], relevant_laws: str = "Standard UAE Contract Law principles apply."):
+        """
+        Evicts the cached answer for a clause, so a finding the Reflector rejected is not served again.
+        If the finding came from a packed batch call, that whole batch response is evicted.
+        """
+        if not self.cache:
+            return
+        self.cache.delete(self.cache.key(self.model_name, self.PROMPT_VERSION, self._clause_inputs(clause_data, relevant_laws)))
+        with self._lock:
+            batch_key = self._batch_keys.pop(self._clause_identity(clause_data), None)
+        if batch_key:
+            self.cache.delete(batch_key)
+
+    @staticmethod
+    def _clause_identity(clause_data: Dict[str, Any]) -> Tuple[str, str]:
+        return (str(clause_data.get("clause_id", "unknown")), clause_data.get("raw_text", ""))
+
+    @staticmethod
+    def _clause_inputs(clause_data: Dict[str, Any], relevant_laws: str) -> Dict[str, Any]:
+        return {
+            "clause_id": clause_data.get("clause_id", "unknown"),
+            "clause_text": clause_data.get("raw_text", ""),
+            "relevant_laws": relevant_laws
+        }
+
+    def _invoke(self, chain, prompt_version: str, inputs: Dict[str, Any], items: int, refresh: bool = False) -> Any:
+        """Runs a chain through the response cache, rate-limiting only real API calls."""
+        def call():
+            if self.rate_limiter:
+                tokens = sum(estimate_tokens(str(v)) for v in inputs.values()) + self.TOKEN_OVERHEAD * items
+                self.rate_limiter.acquire(tokens)
+            return chain.invoke(inputs)
+        
+        return cached_invoke(self.cache, self.model_name, prompt_version, inputs, call, refresh=refresh)
+
+    def pack_batches(self, clauses: List[Dict[str, Any]], max_batch_tokens: int = 3000, max_batch_size: int = 10) -> List[List[Dict[str, Any]]]:
+        """
+        Greedily groups consecutive clauses so each group's clause text stays under the token budget.
+        A clause larger than the budget gets a group of its own.
+        """
+        batches = []
+        current, current_tokens = [], 0
+        for clause in clauses:
+            tokens = estimate_tokens(clause.get("raw_text", ""))
+            if current and (current_tokens + tokens > max_batch_tokens or len(current) >= max_batch_size):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(clause)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def evaluate_batch(self, clauses: List[Dict[str, Any]], relevant_laws: str = "Standard UAE Contract Law principles apply.", max_batch_tokens: int = 3000, max_batch_size: int = 10) -> List[Dict[str, Any]]:
+        """
+        Evaluates several clauses with one LLM call per packed batch.
+        
+        Args:
+            clauses: Dicts containing 'clause_id' and 'raw_text'.
+            relevant_laws: Context retrieved from the Law Vector DB.
+            max_batch_tokens: Budget for the clause text packed into one call.
+            max_batch_size: Maximum clauses per call.
+            
+        Returns:
+            One dict matching CriticOutput per input clause, in input order. Clause IDs
+            repeat within contracts (e.g. "(a)"), so results are positional. Items the model
+            dropped or returned malformed are retried individually through evaluate_clause.
+        """
+        results = []
+        for batch in self.pack_batches(clauses, max_batch_tokens, max_batch_size):
+            results.extend(self._evaluate_packed(batch, relevant_laws))
+        return results
+
+    def _evaluate_packed(self, batch: List[Dict[str, Any]], relevant_laws: str) -> List[Dict[str, Any]]:
+        if len(batch) == 1:
+            return [self.evaluate_clause(batch[0], relevant_laws)]
+        
+        clauses_text = "\n\n".join(
+            f"[Item {n}]\nClause ID: {c.get('clause_id', 'unknown')}\nClause Text: {c.get('raw_text', '')}"
+            for n, c in enumerate(batch)
+        )
+        
+        inputs = {"clauses": clauses_text, "relevant_laws": relevant_laws}
+        items = {}
+        try:
+            response = self._invoke(self.batch_chain, self.BATCH_PROMPT_VERSION, inputs, items=len(batch))
+            for item in response.get("findings", []):
+                if isinstance(item, dict) and isinstance(item.get("item"), int):
+                    items[item["item"]] = item
+        except Exception as e:
+            print(f"Error in Critic Agent batch of {len(batch)}: {e}")
+        
+        batch_key = self.cache.key(self.model_name, self.BATCH_PROMPT_VERSION, inputs) if self.cache else None
+        results = []
+        for n, clause in enumerate(batch):
+            finding = self._validate_item(items.get(n), clause)
+            if finding is None:
+                # Only this item pays for a second call
+                finding = self.evaluate_clause(clause, relevant_laws)
+            elif batch_key:
+                with self._lock:
+                    self._batch_keys[self._clause_identity(clause)] = batch_key
+            results.append(finding)
+        return results
+
+    @staticmethod
+    def _validate_item(item: Optional[Dict[str, Any]], clause: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if item is None:
+            return None
+        try:
+            finding = CriticOutput.model_validate(item).model_dump()
+        except ValidationError:
+            return None
+        # Guard against the model shifting answers between items
+        if finding["clause_id"] != str(clause.get("clause_id")):
+            return None
+        return finding
+
 if __name__ == "__main__":
     # Smoke Test
     agent = CriticAgent()
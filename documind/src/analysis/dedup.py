@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple
+from src.utils.hashing import text_hash
+from src.utils.paths import cache_dir
+
+_WORD_PATTERN = re.compile(r"\w+")
+_NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+
+SIMHASH_BITS = 64
+# 8 bands of 8 bits: two fingerprints within 7 bits of each other agree on at least one band
+BANDS = 8
+BAND_BITS = SIMHASH_BITS // BANDS
+SHINGLE_SIZE = 3
+# Dropping or changing one word of a typical clause moves its SimHash by a handful of bits,
+# while unrelated clauses differ in ~32 of 64
+MAX_DISTANCE = 6
+_BAND_COLUMNS = [f"b{b}" for b in range(BANDS)]
+
+def _tokens(text: str) -> List[str]:
+    return _WORD_PATTERN.findall(text.lower())
+
+def fingerprint(text: str) -> str:
+    """Exact fingerprint of a clause's wording, ignoring case, punctuation, markdown and whitespace."""
+    return text_hash(" ".join(_tokens(text)))
+
+def numbers_key(text: str) -> str:
+    """
+    The clause's numbers in order. Near-duplicates must agree on these exactly, so a
+    30-day notice period never inherits the verdict of a 90-day one.
+    """
+    return " ".join(_NUMBER_PATTERN.findall(text))
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over word shingles; similar wording gives fingerprints a few bits apart."""
+    tokens = _tokens(text)
+    shingles = [" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(max(1, len(tokens) - SHINGLE_SIZE + 1))]
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+def bands(value: int) -> List[int]:
+    mask = (1 << BAND_BITS) - 1
+    return [(value >> (b * BAND_BITS)) & mask for b in range(BANDS)]
+
+def _to_signed(value: int) -> int:
+    # SQLite integers are signed 64-bit
+    return value - (1 << SIMHASH_BITS) if value >= 1 << (SIMHASH_BITS - 1) else value
+
+def assign(finding: Dict[str, Any], clause: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    A representative's (or stored) finding, re-labelled for a duplicate clause.
+    A near-duplicate may word things differently, so the supporting quote is kept only
+    if it appears in the clause's own text; otherwise it is dropped rather than cited unverified.
+    """
+    assigned = {**finding, "clause_id": clause["clause_id"]}
+    quote = " ".join(_tokens(finding.get("source_verification", "")))
+    if quote and quote not in " ".join(_tokens(clause["raw_text"])):
+        assigned["source_verification"] = ""
+    return assigned
+
+class VerdictStore:
+    """
+    Persistent cross-contract store of critic verdicts, keyed by clause fingerprint.
+
+    Lookups match the exact normalized wording first, then near-duplicates through SimHash
+    band columns. `version` (critic model and prompt version) scopes the verdicts so a prompt
+    change never serves stale ones.
+    """
+    def __init__(self, version: str, path: Optional[str] = None, max_distance: int = MAX_DISTANCE):
+        self.version = version
+        self.max_distance = max_distance
+        self.path = path or os.path.join(cache_dir(), "verdicts.sqlite")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts ("
+            "version TEXT NOT NULL, fingerprint TEXT NOT NULL, simhash INTEGER NOT NULL, numbers TEXT NOT NULL, "
+            + "".join(f"{column} INTEGER NOT NULL, " for column in _BAND_COLUMNS) +
+            "finding TEXT NOT NULL, created REAL NOT NULL, PRIMARY KEY (version, fingerprint))"
+        )
+        for column in _BAND_COLUMNS:
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS verdicts_{column} ON verdicts ({column}, numbers)")
+        self._conn.commit()
+
+    def get(self, text: str) -> Optional[Dict[str, Any]]:
+        """Returns the stored verdict for this clause wording or a near-duplicate of it."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT finding FROM verdicts WHERE version = ? AND fingerprint = ?", (self.version, fingerprint(text))
+            ).fetchone()
+            if row:
+                return json.loads(row[0])
+            if not self.max_distance:
+                return None
+
+            value = simhash(text)
+            clause_bands = bands(value)
+            rows = self._conn.execute(
+                "SELECT simhash, finding FROM verdicts WHERE version = ? AND numbers = ? AND ("
+                + " OR ".join(f"{column} = ?" for column in _BAND_COLUMNS) + ")",
+                (self.version, numbers_key(text), *clause_bands)
+            ).fetchall()
+        best, best_distance = None, self.max_distance + 1
+        for stored, finding in rows:
+            distance = ((stored & ((1 << SIMHASH_BITS) - 1)) ^ value).bit_count()
+            if distance < best_distance:
+                best, best_distance = finding, distance
+        return json.loads(best) if best else None
+
+    def put(self, text: str, finding: Dict[str, Any]):
+        value = simhash(text)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO verdicts VALUES ({', '.join('?' * (6 + BANDS))})",
+                (self.version, fingerprint(text), _to_signed(value), numbers_key(text), *bands(value),
+                 json.dumps(finding, ensure_ascii=False), time.time())
+            )
+            self._conn.commit()
+
+class ClauseDeduplicator:
+    """
+    Groups exact and near-duplicate clauses so only one representative per group is audited.
+    Optionally backed by a VerdictStore holding verdicts from earlier runs and other contracts.
+    """
+    def __init__(self, store: Optional[VerdictStore] = None, max_distance: int = MAX_DISTANCE):
+        self.store = store
+        self.max_distance = max_distance
+
+    def group(self, clauses: List[Dict[str, Any]]) -> List[List[int]]:
+        """
+        Returns groups of clause indices in first-seen order; the first index of each
+        group is its representative.
+        """
+        groups: List[List[int]] = []
+        by_fingerprint: Dict[str, int] = {}
+        by_band: Dict[Tuple[int, int, str], List[int]] = {}
+        signatures: List[int] = []
+
+        for i, clause in enumerate(clauses):
+            text = clause["raw_text"]
+            exact = fingerprint(text)
+            if exact in by_fingerprint:
+                groups[by_fingerprint[exact]].append(i)
+                continue
+
+            value = simhash(text)
+            numbers = numbers_key(text)
+            keys = [(b, band, numbers) for b, band in enumerate(bands(value))]
+            match = None
+            if self.max_distance:
+                for key in keys:
+                    for g in by_band.get(key, []):
+                        if (signatures[g] ^ value).bit_count() <= self.max_distance:
+                            match = g
+                            break
+                    if match is not None:
+                        break
+
+            if match is None:
+                match = len(groups)
+                groups.append([])
+                signatures.append(value)
+                for key in keys:
+                    by_band.setdefault(key, []).append(match)
+            groups[match].append(i)
+            by_fingerprint[exact] = match
+        return groups
+
+    def lookup(self, clause: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        return self.store.get(clause["raw_text"]) if self.store else None
+
+    def remember(self, clause: Dict[str, Any], finding: Dict[str, Any], verified: bool):
+        """
+        Stores a representative's verdict for future runs. Failed audits, and findings the
+        Reflector never verified (e.g. ones that ran out of retries), are not stored.
+        """
+        if self.store and verified and finding.get("status") != "ERROR":
+            self.store.put(clause["raw_text"], finding)
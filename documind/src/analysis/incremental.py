@@ -0,0 +1,140 @@
+import json
+import os
+from difflib import SequenceMatcher
+from typing import List, Dict, Any, Optional, Tuple
+from src.utils.hashing import text_hash
+from src.utils.paths import cache_dir
+
+# Minimum similarity for a same-ID clause to count as an edit of the old one rather than a replacement
+FUZZY_MATCH_THRESHOLD = 0.6
+
+def clause_hash(clause: Dict[str, Any]) -> str:
+    return text_hash(clause["raw_text"])
+
+def align_clauses(new_clauses: List[Dict[str, Any]], old_clauses: List[Dict[str, Any]]) -> List[Tuple[str, Optional[int]]]:
+    """
+    Aligns a new contract version's clauses with the previous version's.
+
+    Returns:
+        One (status, old_index) per new clause, where status is
+        "unchanged" (same text, possibly renumbered), "modified" (same clause_id, similar text)
+        or "added" (old_index is None).
+    """
+    by_id_and_hash: Dict[Tuple[str, str], List[int]] = {}
+    by_hash: Dict[str, List[int]] = {}
+    by_id: Dict[str, List[int]] = {}
+    for i, old in enumerate(old_clauses):
+        h = old.get("content_hash") or clause_hash(old)
+        by_id_and_hash.setdefault((old["clause_id"], h), []).append(i)
+        by_hash.setdefault(h, []).append(i)
+        by_id.setdefault(old["clause_id"], []).append(i)
+
+    used = set()
+    def take(candidates: List[int]) -> Optional[int]:
+        for i in candidates:
+            if i not in used:
+                used.add(i)
+                return i
+        return None
+
+    alignment: List[Optional[Tuple[str, Optional[int]]]] = [None] * len(new_clauses)
+    hashes = [clause_hash(c) for c in new_clauses]
+
+    # 1. Identical text under the same clause ID, then identical text that moved or was renumbered
+    for n, clause in enumerate(new_clauses):
+        old = take(by_id_and_hash.get((clause["clause_id"], hashes[n]), []))
+        if old is not None:
+            alignment[n] = ("unchanged", old)
+    for n, clause in enumerate(new_clauses):
+        if alignment[n] is None:
+            old = take(by_hash.get(hashes[n], []))
+            if old is not None:
+                alignment[n] = ("unchanged", old)
+
+    # 2. Edited text: best fuzzy match among unused old clauses with the same ID
+    for n, clause in enumerate(new_clauses):
+        if alignment[n] is not None:
+            continue
+        best, best_score = None, FUZZY_MATCH_THRESHOLD
+        for i in by_id.get(clause["clause_id"], []):
+            if i in used:
+                continue
+            matcher = SequenceMatcher(None, old_clauses[i]["raw_text"], clause["raw_text"], autojunk=False)
+            if matcher.quick_ratio() < best_score:
+                continue
+            score = matcher.ratio()
+            if score >= best_score:
+                best, best_score = i, score
+        if best is not None:
+            used.add(best)
+            alignment[n] = ("modified", best)
+        else:
+            alignment[n] = ("added", None)
+
+    return alignment
+
+class AuditRecord:
+    """
+    Clauses and findings of the last audit run for a contract namespace, persisted so
+    the next version of the contract only re-audits what changed.
+    """
+    def __init__(self, namespace: str, pdf_hash: str, clauses: List[Dict[str, Any]], findings: List[Optional[Dict[str, Any]]]):
+        self.namespace = namespace
+        self.pdf_hash = pdf_hash
+        self.clauses = clauses
+        self.findings = findings
+
+    @staticmethod
+    def path_for(namespace: str) -> str:
+        return os.path.join(cache_dir("audit_runs"), f"{namespace}.json")
+
+    @classmethod
+    def load(cls, namespace: str) -> Optional["AuditRecord"]:
+        path = cls.path_for(namespace)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["namespace"], data["pdf_hash"], data["clauses"], data["findings"])
+
+    def save(self):
+        clauses = [
+            {
+                "clause_id": c["clause_id"],
+                "section": c["section"],
+                "page_no": c["page_no"],
+                "raw_text": c["raw_text"],
+                "content_hash": c.get("content_hash") or clause_hash(c)
+            }
+            for c in self.clauses
+        ]
+        path = self.path_for(self.namespace)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"namespace": self.namespace, "pdf_hash": self.pdf_hash, "clauses": clauses, "findings": self.findings}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def carry_forward(self, new_clauses: List[Dict[str, Any]]) -> Tuple[List[Optional[Dict[str, Any]]], Dict[str, int]]:
+        """
+        Reuses findings of unchanged clauses.
+
+        Returns:
+            (carried, counts): carried holds the previous finding for each unchanged clause
+            and None for clauses that must be (re-)audited; counts tallies each alignment status.
+        """
+        carried = []
+        counts = {"unchanged": 0, "modified": 0, "added": 0, "removed": 0}
+        matched = set()
+        for clause, (status, old) in zip(new_clauses, align_clauses(new_clauses, self.clauses)):
+            counts[status] += 1
+            if old is not None:
+                matched.add(old)
+
+            finding = self.findings[old] if status == "unchanged" else None
+            # Failed audits are retried rather than carried forward
+            if finding and finding.get("status") != "ERROR":
+                carried.append({**finding, "clause_id": clause["clause_id"]})
+            else:
+                carried.append(None)
+        counts["removed"] = len(self.clauses) - len(matched)
+        return carried, counts
@@ -1,8 +1,13 @@
-from typing import TypedDict, Dict, Any, Optional
-from langgraph.graph import StateGraph, END
+from typing import TypedDict, Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 from src.analysis.critic_agent import CriticAgent
 from src.analysis.reflector_node import Reflector
+from src.analysis.triage import ClauseTriage
 from src.ingestion.vector_store import VectorStoreManager
+from src.ingestion.law_index import LawIndex
+from src.utils.llm_cache import LLMResponseCache
+from src.utils.rate_limiter import RateLimiter
+from src.utils.telemetry import telemetry, bind_context
 
 class AgentState(TypedDict):
     clause: Dict[str, Any]
@@ -12,32 +17,120 @@ class AgentState(TypedDict):
     attempts: int
     final_output: Optional[Dict[str, Any]]
 
+# Used when no law-corpus index has been built
+DEFAULT_RELEVANT_LAWS = "Standard UAE Contract Law applies."
+
 class AuditWorkflow:
-    def __init__(self):
-        self.critic_agent = CriticAgent()
-        # Initializing VectorStore might need environment variables to be set
-        # For now, we instantiate it here, but in prod could be passed in.
+    # Articles retrieved per clause, and at most this many for a packed critic batch
+    LAWS_PER_CLAUSE = 3
+    LAWS_PER_BATCH = 6
+
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None, llm_cache: Optional[LLMResponseCache] = None, vs_manager: Optional[VectorStoreManager] = None, law_index: Optional[LawIndex] = None, critic_agent: Optional[CriticAgent] = None, triage: Optional[ClauseTriage] = None):
+        # The rate limiter is shared across all concurrently running clause audits
+        self.critic_agent = critic_agent or CriticAgent(cache=llm_cache, rate_limiter=rate_limiter)
+        # Initializing VectorStore might need environment variables to be set.
+        # Callers that already hold a manager (e.g. batch runs) pass it in to share its clients.
         try:
-            self.vs_manager = VectorStoreManager()
+            self.vs_manager = vs_manager or VectorStoreManager()
             self.reflector = Reflector(self.vs_manager)
         except Exception as e:
             print(f"Warning: VectorStore validation disabled due to init error: {e}")
             self.reflector = None
+            self.vs_manager = vs_manager
+        # Grounding for the critic: the local law-corpus index, if one has been built
+        self.law_index = law_index or LawIndex.load_default()
+        # Optional cheap tier: clauses it clears never reach the critic's model
+        self.triage = triage
+
+    def verdict_version(self) -> str:
+        """Identifies the models and prompts producing findings, e.g. to key stored verdicts."""
+        version = f"{self.critic_agent.model_name}:{CriticAgent.PROMPT_VERSION}"
+        if self.triage:
+            version += f"+{self.triage.model_name}:{ClauseTriage.PROMPT_VERSION}:{self.triage.min_confidence}"
+        return version
 
     def critic_node(self, state: AgentState):
         """Node for the Critic Agent"""
         print(f"--- Critic Node (Attempt {state['attempts'] + 1}) ---")
         
-        # In a real scenario, we'd retrieve laws here based on clause text
-        relevant_laws = "Standard UAE Contract Law applies." 
-        
-        finding = self.critic_agent.evaluate_clause(state['clause'], relevant_laws)
+        with telemetry.contract(state['contract_namespace']), telemetry.span("critic_node"):
+            if state['attempts']:
+                telemetry.count("critic_retries")
+            
+            # Only first attempts are triaged; a finding the Reflector rejected goes to the critic
+            finding = None
+            if self.triage and not state['attempts']:
+                finding = self.triage.review(state['clause'])
+            
+            if finding is None:
+                with telemetry.span("law_retrieval"):
+                    relevant_laws = self._relevant_laws(state['clause'])
+                # A retry must reach the model: the cached answer is the one just rejected
+                finding = self.critic_agent.evaluate_clause(state['clause'], relevant_laws, refresh=bool(state['attempts']))
         
         return {
             "critic_finding": finding,
             "attempts": state['attempts'] + 1
         }
 
+    def _retrieve_laws(self, clause: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if not self.law_index:
+            return []
+        # The clause was embedded at ingestion, so its vector is a local cache hit rather than an API call
+        vector = None
+        cache = self.vs_manager.embedding_cache if self.vs_manager else None
+        if cache and self.law_index.vectors is not None and cache.model == self.law_index.embedding_model:
+            vector = cache.get_many([clause['raw_text']])[0]
+        return self.law_index.search(clause['raw_text'], self.LAWS_PER_CLAUSE, vector)
+
+    def _relevant_laws(self, clause: Dict[str, Any]) -> str:
+        articles = self._retrieve_laws(clause)
+        return self.law_index.format_articles(articles) if articles else DEFAULT_RELEVANT_LAWS
+
+    def critic_batch(self, clauses: List[Dict[str, Any]], max_batch_tokens: int = 3000, concurrency: int = 1) -> List[Dict[str, Any]]:
+        """
+        First-pass critic findings for many clauses, packing several clauses per LLM call.
+        Seed each clause's initial state with its finding so the graph starts at the reflector;
+        rejected findings are retried through the regular single-clause critic node.
+        With triage enabled, only the clauses it escalates are sent to the critic.
+        
+        Returns:
+            One finding per clause, in clause order.
+        """
+        findings: List[Optional[Dict[str, Any]]] = [None] * len(clauses)
+        if self.triage:
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+                findings = list(executor.map(bind_context(self.triage.review), clauses))
+        escalated = [i for i, finding in enumerate(findings) if finding is None]
+        
+        batches = self.critic_agent.pack_batches([clauses[i] for i in escalated], max_batch_tokens)
+        print(f"Evaluating {len(escalated)} clauses in {len(batches)} critic batches...")
+        
+        def evaluate(batch):
+            # Union of the clauses' articles, best first, deduplicated
+            articles, seen = [], set()
+            for article in sorted((a for c in batch for a in self._retrieve_laws(c)), key=lambda a: -a["score"]):
+                key = (article["source"], article["article_id"])
+                if key not in seen and len(articles) < self.LAWS_PER_BATCH:
+                    seen.add(key)
+                    articles.append(article)
+            relevant_laws = self.law_index.format_articles(articles) if articles else DEFAULT_RELEVANT_LAWS
+            return self.critic_agent.evaluate_batch(batch, relevant_laws, max_batch_tokens)
+        
+        def timed_evaluate(batch):
+            with telemetry.span("critic_batch"):
+                return evaluate(batch)
+        
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            batched = [finding for batch_findings in executor.map(bind_context(timed_evaluate), batches) for finding in batch_findings]
+        for i, finding in zip(escalated, batched):
+            findings[i] = finding
+        return findings
+
+    def route_entry(self, state: AgentState):
+        """Entry Edge Logic: skip the critic when a batch pass already produced a finding"""
+        return "reflector" if state.get('critic_finding') else "critic"
+
     def reflector_node(self, state: AgentState):
         """Node for the Reflector (Hallucination Checker)"""
         print("--- Reflector Node ---")
@@ -49,10 +142,21 @@ class AuditWorkflow:
         finding = state['critic_finding']
         namespace = state['contract_namespace']
         
-        result = self.reflector.validate_critic(finding, namespace)
+        with telemetry.contract(namespace), telemetry.span("reflector_node"):
+            result = self.reflector.validate_critic(finding, namespace)
+            if not result['verified']:
+                telemetry.count("reflector_rejections")
+                self._forget(state['clause'], finding)
         
         return {"verification_result": result}
 
+    def _forget(self, clause: Dict[str, Any], finding: Dict[str, Any]):
+        """Evicts the cached answer behind a rejected finding, so later runs ask the model again."""
+        if self.triage and finding.get("reviewed_by") == self.triage.model_name:
+            self.triage.forget(clause)
+        else:
+            self.critic_agent.forget(clause, self._relevant_laws(clause))
+
     def should_continue(self, state: AgentState):
         """Conditional Edge Logic"""
         verification = state['verification_result']
@@ -61,17 +165,27 @@ class AuditWorkflow:
             return "end"
         
         if state['attempts'] >= 3:
+            telemetry.count("max_retries_reached", contract=state['contract_namespace'])
             return "end_max_retries"
             
         return "retry"
 
     def build_graph(self):
+        # LangGraph is the slowest import in the pipeline; only runs that build the graph pay for it
+        from langgraph.graph import StateGraph, END
+        
         workflow = StateGraph(AgentState)
         
         workflow.add_node("critic", self.critic_node)
         workflow.add_node("reflector", self.reflector_node)
         
-        workflow.set_entry_point("critic")
+        workflow.set_conditional_entry_point(
+            self.route_entry,
+            {
+                "critic": "critic",
+                "reflector": "reflector"
+            }
+        )
         
         workflow.add_edge("critic", "reflector")
         
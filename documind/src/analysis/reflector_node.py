@@ -1,13 +1,47 @@
-from typing import Dict, Any
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
 from src.ingestion.vector_store import VectorStoreManager
+from src.ingestion.quote_index import QuoteIndex
 
 class Reflector:
     """
     Validates the Critic's findings by performing a 'Reverse Lookup' 
-    against the verified source text in the Vector Database.
+    against the verified source text of the contract.
+    
+    Quotes are checked against the contract's local QuoteIndex (built at ingest time).
+    Contracts ingested before the index existed fall back to a dense similarity lookup
+    in the Vector Database.
     """
+    # Share of the quote's word shingles that must appear in one chunk for a near-exact match
+    # (0.8 tolerates roughly one dropped or altered word per 15 words quoted)
+    QUOTE_MATCH_THRESHOLD = 0.8
+    # Contracts whose quote index is kept in memory; a batch run touches only a few at a time
+    QUOTE_INDEX_CACHE_SIZE = 16
+
     def __init__(self, vector_store: VectorStoreManager):
         self.vector_store = vector_store
+        self._quote_indexes: "OrderedDict[str, Tuple[Optional[float], Optional[QuoteIndex]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _quote_index(self, contract_namespace: str) -> Optional[QuoteIndex]:
+        """The contract's saved QuoteIndex, reloaded when the file changes (e.g. after a re-ingest)."""
+        path = QuoteIndex.path_for(contract_namespace)
+        mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        with self._lock:
+            cached = self._quote_indexes.get(contract_namespace)
+            if cached is not None and cached[0] == mtime:
+                self._quote_indexes.move_to_end(contract_namespace)
+                return cached[1]
+        
+        quote_index = QuoteIndex.load(path) if mtime is not None else None
+        with self._lock:
+            self._quote_indexes[contract_namespace] = (mtime, quote_index)
+            self._quote_indexes.move_to_end(contract_namespace)
+            if len(self._quote_indexes) > self.QUOTE_INDEX_CACHE_SIZE:
+                self._quote_indexes.popitem(last=False)
+        return quote_index
 
     def validate_critic(self, critic_output: Dict[str, Any], contract_namespace: str) -> Dict[str, Any]:
         """
@@ -18,7 +52,7 @@ class Reflector:
             contract_namespace: The Pinecone namespace for the specific contract.
             
         Returns:
-            Dict: { "verified": bool, "reason": str }
+            Dict: { "verified": bool, "reason": str, "match": Optional[Dict] }
         """
         source_quote = critic_output.get("source_verification", "").strip()
         status = critic_output.get("status")
@@ -34,12 +68,14 @@ class Reflector:
                 "reason": "Critic failed to provide a source verification quote."
             }
 
-        # Case 3: Verify the quote
-        # We search for the EXACT quote in the vector DB.
-        # Ideally, we'd use a sparse search (BM25) for exact matching, 
-        # but dense embedding similarity is a good proxy if threshold is high.
-        
-        matches = self.vector_store.query_similarity(source_quote, top_k=1)
+        # Case 3: Verify the quote against the contract text itself
+        quote_index = self._quote_index(contract_namespace)
+        if quote_index is not None:
+            return self._validate_with_index(quote_index, source_quote)
+
+        # Case 4: No local index for this contract.
+        # Dense embedding similarity is a reasonable proxy if the threshold is high.
+        matches = self.vector_store.query_similarity(source_quote, top_k=1, namespace=contract_namespace)
         
         if not matches:
              return {
@@ -61,3 +97,26 @@ class Reflector:
             }
             
         return {"verified": True, "reason": "Source verified in document."}
+
+    def _validate_with_index(self, quote_index: QuoteIndex, source_quote: str) -> Dict[str, Any]:
+        match = quote_index.find(source_quote)
+        
+        if not match:
+            return {
+                "verified": False,
+                "reason": "No matching text found in the document."
+            }
+        
+        if match['score'] < self.QUOTE_MATCH_THRESHOLD:
+            return {
+                "verified": False,
+                "reason": f"Quote verification failed. Best containment in clause {match['clause_id']} (page {match['page_no']}): {match['score']:.2f}. potential hallucination.",
+                "match": match
+            }
+        
+        kind = "verbatim" if match['exact'] else "near-verbatim"
+        return {
+            "verified": True,
+            "reason": f"Source verified {kind} in clause {match['clause_id']} (page {match['page_no']}).",
+            "match": match
+        }
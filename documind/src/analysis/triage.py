@@ -0,0 +1,169 @@
+import os
+import re
+import threading
+from typing import Dict, Any, Optional
+from pydantic import BaseModel, Field
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.language_models import BaseChatModel
+from langchain_core.output_parsers import JsonOutputParser
+from src.reporting.risk_engine import RiskEngine
+from src.utils.llm_cache import LLMResponseCache, cached_invoke
+from src.utils.rate_limiter import RateLimiter, estimate_tokens
+from src.utils.llm_provider import get_provider
+from src.utils.telemetry import telemetry
+
+class TriageOutput(BaseModel):
+    clause_id: str = Field(description="The ID of the clause being screened")
+    status: str = Field(description="COMPLIANT, VIOLATION, or MISSING")
+    confidence: float = Field(description="Confidence in the status, from 0 to 1")
+    law_reference: str = Field(description="Reference to the specific UAE law, if any")
+    reasoning: str = Field(description="Short explanation of the decision")
+    source_verification: str = Field(description="The exact quote from the clause that supports this decision")
+
+class ClauseTriage:
+    """
+    Cheap first tier in front of the CriticAgent.
+
+    1. A local keyword/rule screen escalates clauses touching risky subjects (the severity
+       keywords the RiskEngine scores, plus terms labour-law violations hide in) or stating
+       durations and amounts, where statutory minimums are usually breached.
+    2. Everything else goes to a cheaper model. Its COMPLIANT verdicts at or above
+       `min_confidence` are accepted as the clause's finding (and still checked by the
+       Reflector); anything flagged, uncertain or unparseable escalates to the critic.
+
+    Settings come from arguments or the environment, so each deployment can trade cost
+    against how much the expensive model sees:
+        DOCUMIND_TRIAGE_MODEL       cheap model (default gpt-4o-mini)
+        DOCUMIND_TRIAGE_CONFIDENCE  minimum confidence to accept a COMPLIANT verdict (default 0.85)
+    """
+    PROMPT_VERSION = "triage-v1"
+    # System prompt and the JSON answer, on top of the clause text itself
+    TOKEN_OVERHEAD = 300
+
+    RISK_KEYWORDS = tuple(k for _, keywords in RiskEngine.SEVERITY_KEYWORDS for k in keywords) + (
+        "probation", "leave", "working hours", "overtime", "salary", "wage", "gratuity", "compet",
+        "deduct", "forfeit", "waive", "sole discretion", "without notice", "dismiss", "passport",
+    )
+    # Durations, amounts and percentages
+    NUMERIC_TERMS = re.compile(r"\d+\s*(?:day|week|month|year|hour|%|percent)|\b(?:AED|USD|Dhs?)\b", re.IGNORECASE)
+
+    def __init__(self, model_name: Optional[str] = None, min_confidence: Optional[float] = None, cache: Optional[LLMResponseCache] = None,
+                 rate_limiter: Optional[RateLimiter] = None, llm: Optional[BaseChatModel] = None):
+        self.model_name = model_name or os.getenv("DOCUMIND_TRIAGE_MODEL", "gpt-4o-mini")
+        self.min_confidence = min_confidence if min_confidence is not None else float(os.getenv("DOCUMIND_TRIAGE_CONFIDENCE", "0.85"))
+        self.llm = llm or get_provider().chat(self.model_name, temperature=0)
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self._counts = {"screened": 0, "cleared": 0, "escalated_rules": 0, "escalated_model": 0, "escalated_low_confidence": 0, "escalated_error": 0}
+        self._lock = threading.Lock()
+
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are screening employment contract clauses for a UAE Labour Law audit.
+            Decide quickly whether the clause is plainly compliant boilerplate.
+
+            You must output a JSON object with the following fields:
+            - clause_id: The ID provided.
+            - status: COMPLIANT, VIOLATION, or MISSING.
+            - confidence: How sure you are of the status, from 0 to 1. Use a low value whenever the clause needs a closer legal review.
+            - law_reference: Cite the specific UAE law, if any.
+            - reasoning: One sentence.
+            - source_verification: Copy the EXACT text from the clause that you used to make this decision.
+            """),
+            ("user", """
+            Clause ID: {clause_id}
+            Clause Text: {clause_text}
+
+            Relevant Laws: none retrieved; judge against standard UAE norms.
+            """)
+        ])
+        self.chain = self.prompt | self.llm | JsonOutputParser(pydantic_object=TriageOutput)
+
+    def screen(self, clause: Dict[str, Any]) -> Optional[str]:
+        """
+        Local rule screen.
+
+        Returns:
+            The reason to escalate, or None if the clause can go to the cheap model.
+        """
+        text = clause.get("raw_text", "").lower()
+        for keyword in self.RISK_KEYWORDS:
+            if keyword in text:
+                return f"keyword '{keyword}'"
+        if self.NUMERIC_TERMS.search(text):
+            return "states a duration or amount"
+        return None
+
+    def review(self, clause: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Triages one clause.
+
+        Returns:
+            A COMPLIANT finding if the clause is cleared at this tier, or None if it must
+            go to the critic.
+        """
+        self._count("screened")
+        if self.screen(clause):
+            return self._escalate("escalated_rules")
+
+        inputs = self._clause_inputs(clause)
+        try:
+            with telemetry.span("triage", model=self.model_name):
+                result = cached_invoke(self.cache, self.model_name, self.PROMPT_VERSION, inputs, lambda: self._call(inputs))
+            confidence = float(result.get("confidence", 0))
+        except Exception as e:
+            print(f"Error in triage for clause {inputs['clause_id']}: {e}")
+            return self._escalate("escalated_error")
+
+        if result.get("status") != "COMPLIANT":
+            return self._escalate("escalated_model")
+        if confidence < self.min_confidence:
+            return self._escalate("escalated_low_confidence")
+
+        self._count("cleared")
+        telemetry.count("triage", outcome="cleared")
+        return {
+            "clause_id": inputs["clause_id"],
+            "status": "COMPLIANT",
+            "law_reference": result.get("law_reference", ""),
+            "reasoning": result.get("reasoning", ""),
+            "source_verification": result.get("source_verification", ""),
+            "reviewed_by": self.model_name,
+        }
+
+    def forget(self, clause: Dict[str, Any]):
+        """Evicts the cached screening answer for a clause whose cleared finding the Reflector rejected."""
+        if self.cache:
+            self.cache.delete(self.cache.key(self.model_name, self.PROMPT_VERSION, self._clause_inputs(clause)))
+
+    @staticmethod
+    def _clause_inputs(clause: Dict[str, Any]) -> Dict[str, Any]:
+        return {"clause_id": clause.get("clause_id", "unknown"), "clause_text": clause.get("raw_text", "")}
+
+    def _call(self, inputs: Dict[str, Any]) -> Any:
+        if self.rate_limiter:
+            self.rate_limiter.acquire(estimate_tokens(inputs["clause_text"]) + self.TOKEN_OVERHEAD)
+        return self.chain.invoke(inputs)
+
+    def _count(self, key: str):
+        with self._lock:
+            self._counts[key] += 1
+
+    def _escalate(self, reason: str) -> None:
+        self._count(reason)
+        telemetry.count("triage", outcome=reason)
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Counts per outcome, plus the share of screened clauses escalated to the critic."""
+        with self._lock:
+            counts = dict(self._counts)
+        escalated = counts["screened"] - counts["cleared"]
+        counts["escalation_rate"] = escalated / counts["screened"] if counts["screened"] else 0.0
+        return counts
+
+    def summary(self) -> str:
+        stats = self.stats()
+        return (f"Triage ({self.model_name}, min confidence {self.min_confidence:.2f}): {stats['screened']} clauses, "
+                f"{stats['cleared']} cleared, escalated {stats['escalation_rate']:.0%} "
+                f"({stats['escalated_rules']} by rules, {stats['escalated_model']} flagged, "
+                f"{stats['escalated_low_confidence']} low confidence, {stats['escalated_error']} errors)")
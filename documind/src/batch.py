@@ -0,0 +1,338 @@
+import argparse
+import asyncio
+import glob
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+from dotenv import load_dotenv
+
+# Only what parse workers and per-contract outputs need is imported at module level (PyMuPDF
+# itself loads on first parse); the LangChain/LangGraph side is imported in main() once
+# arguments are parsed.
+from src.ingestion.pdf_parser import PDFProcessor
+from src.ingestion.chunk_manifest import ChunkManifest
+from src.analysis.checkpoint import AuditCheckpoint
+from src.reporting.report_sink import ReportSink
+from src.utils.hashing import file_hash, text_hash
+from src.utils.telemetry import telemetry
+
+# Load environment variables
+load_dotenv()
+
+def _parse_contract(pdf_path: str) -> Tuple[str, List[Dict[str, Any]], float]:
+    """
+    Process-pool worker: parses one contract, reusing its chunk manifest when available.
+    
+    Returns:
+        (pdf_hash, chunks, parse_seconds)
+    """
+    start = time.perf_counter()
+    pdf_hash = file_hash(pdf_path)
+    manifest = ChunkManifest(PDFProcessor.PARSER_VERSION)
+    chunks = manifest.load(pdf_hash)
+    if chunks is None:
+        chunks = PDFProcessor().parse_pdf(pdf_path)
+        if chunks:
+            manifest.save(pdf_hash, chunks)
+    return pdf_hash, chunks, time.perf_counter() - start
+
+class ContractJob:
+    """One contract in a batch run, with its parse output and timing."""
+    def __init__(self, pdf_path: str, name: str, pdf_hash: str, chunks: List[Dict[str, Any]], parse_seconds: float):
+        self.pdf_path = pdf_path
+        self.name = name
+        self.namespace = _namespace(name)
+        self.pdf_hash = pdf_hash
+        self.chunks = chunks
+        self.clauses = [c for c in chunks if c['clause_id'] != "General"]
+        self.pages = max((c['page_no'] for c in chunks), default=0)
+        self.parse_seconds = parse_seconds
+        self.audit_seconds = 0.0
+
+class ContractOutputs:
+    """
+    A contract's findings JSONL and audit checkpoint.
+
+    Both files are opened when the contract's first finding is written and closed as soon as
+    its last clause is done, so a large batch only holds file handles for the contracts
+    currently being audited. The checkpoint is kept if any clause failed, else deleted.
+    """
+    def __init__(self, job: ContractJob, output_dir: str, resume: bool):
+        self.job = job
+        self.jsonl_path = os.path.join(output_dir, f"audit_findings_{job.name}.jsonl")
+        self.resume = resume
+        self.remaining = len(job.clauses)
+        self.failed = False
+        self._sink = None
+        self._checkpoint = None
+        self._finished = False
+        self._lock = threading.Lock()
+
+    def completed(self) -> List[Optional[Dict[str, Any]]]:
+        """Findings checkpointed by an interrupted run, or None where the clause must be audited."""
+        checkpoint = AuditCheckpoint(self.job.namespace, self.job.pdf_hash, resume=True)
+        try:
+            return checkpoint.completed(self.job.clauses)
+        finally:
+            checkpoint.close()
+
+    def write(self, position: int, finding: Dict[str, Any], record: bool = True):
+        """Writes one clause's finding (checkpointing it unless `record` is False) and counts the clause as done."""
+        with self._lock:
+            self._open()
+            if record:
+                self._checkpoint.record(position, self.job.clauses[position], finding)
+            self._sink.write(position, finding)
+            if finding.get("status") == "ERROR":
+                self.failed = True
+            self._done()
+
+    def fail(self):
+        """Counts a clause whose audit produced no finding as done, keeping the checkpoint for --resume."""
+        with self._lock:
+            self.failed = True
+            self._done()
+
+    def finish_if_done(self):
+        """Finishes a contract with nothing left to audit, e.g. one fully resumed from its checkpoint."""
+        with self._lock:
+            if self.remaining <= 0:
+                self._finish()
+
+    def close(self):
+        """Closes whatever is still open (e.g. after an aborted run), keeping the checkpoint."""
+        with self._lock:
+            if self._sink and not self._finished:
+                self._sink.close()
+                self._checkpoint.close()
+                self._finished = True
+
+    def _open(self):
+        if self._sink is None:
+            self._sink = ReportSink(self.jsonl_path)
+            self._checkpoint = AuditCheckpoint(self.job.namespace, self.job.pdf_hash, resume=self.resume)
+
+    def _done(self):
+        self.remaining -= 1
+        if self.remaining <= 0:
+            self._finish()
+
+    def _finish(self):
+        if self._finished:
+            return
+        self._open()
+        self._sink.close()
+        if self.failed:
+            self._checkpoint.close()
+        else:
+            self._checkpoint.discard()
+        self._finished = True
+
+def _resolve_inputs(target: str) -> List[str]:
+    pattern = os.path.join(target, "*.pdf") if os.path.isdir(target) else target
+    return sorted(glob.glob(pattern))
+
+def _namespace(name: str) -> str:
+    return f"contract_{name.lower().replace(' ', '_')}"
+
+def _contract_names(pdf_paths: List[str]) -> Dict[str, str]:
+    """
+    Report/namespace name for each contract: its file name without extension.
+    Contracts whose names would collide (e.g. 'a/msa.pdf' and 'b/msa.pdf' from a recursive
+    glob) get a short hash of their path appended, so they never share a vector namespace,
+    quote index, findings file or checkpoint.
+    """
+    names = {path: os.path.splitext(os.path.basename(path))[0] for path in pdf_paths}
+    counts: Dict[str, int] = {}
+    for name in names.values():
+        counts[_namespace(name)] = counts.get(_namespace(name), 0) + 1
+    for path, name in names.items():
+        if counts[_namespace(name)] > 1:
+            names[path] = f"{name}_{text_hash(os.path.abspath(path))[:8]}"
+            print(f"Note: {path} shares its name with another contract; reporting it as '{names[path]}'.")
+    return names
+
+def main():
+    parser = argparse.ArgumentParser(description="DocuMind: Batch Legal Contract Auditor")
+    parser.add_argument("target", help="Directory of PDF contracts, or a glob such as 'contracts/*.pdf'")
+    parser.add_argument("--output-dir", default="reports", help="Where findings and reports are written")
+    parser.add_argument("--skip-ingest", action="store_true", help="Skip ingestion if already indexed")
+    parser.add_argument("--parse-workers", type=int, default=os.cpu_count() or 1, help="Processes used to parse contracts")
+    parser.add_argument("--concurrency", type=int, default=8, help="Clauses audited concurrently across all contracts")
+    parser.add_argument("--rpm", type=float, default=None, help="Max LLM requests per minute across the batch")
+    parser.add_argument("--tpm", type=float, default=None, help="Max LLM tokens per minute across the batch")
+    parser.add_argument("--resume", action="store_true", help="Skip clauses already completed by an interrupted batch run")
+    parser.add_argument("--dedup", action="store_true", help="Audit one representative per group of (near-)duplicate clauses across all contracts")
+    parser.add_argument("--triage", action="store_true", help="Screen clauses with local rules and a cheaper model first; only escalated clauses reach the critic model")
+    parser.add_argument("--triage-model", default=None, help="Cheap screening model (default: DOCUMIND_TRIAGE_MODEL or gpt-4o-mini)")
+    parser.add_argument("--triage-confidence", type=float, default=None, help="Minimum confidence for the cheap model's COMPLIANT verdicts to be accepted (default 0.85)")
+    parser.add_argument("--telemetry-dir", default=None, help="Write a Prometheus textfile and a JSON trace of stage latencies, tokens and cost here")
+    parser.add_argument("--no-llm-cache", action="store_true", help="Always call the LLMs instead of reusing cached responses")
+    
+    args = parser.parse_args()
+    
+    pdf_paths = _resolve_inputs(args.target)
+    if not pdf_paths:
+        print(f"Error: No PDF contracts found for {args.target}")
+        sys.exit(1)
+    os.makedirs(args.output_dir, exist_ok=True)
+    
+    from src.ingestion.vector_store import VectorStoreManager
+    from src.ingestion.quote_index import QuoteIndex
+    from src.analysis.langgraph_workflow import AuditWorkflow
+    from src.analysis.audit_runner import initial_state, audit_states_async
+    from src.analysis.triage import ClauseTriage
+    from src.analysis.dedup import ClauseDeduplicator, VerdictStore, assign
+    from src.reporting.summarizer_agent import SummarizerAgent
+    from src.utils.llm_cache import LLMResponseCache
+    from src.utils.rate_limiter import RateLimiter
+    
+    print(f"--- Starting DocuMind Batch Audit for {len(pdf_paths)} contracts ---")
+    
+    # --- PHASE 1: INGESTION (parsing runs one process per contract) ---
+    print("\n[Phase 1] Ingesting Contracts...")
+    print("Parsing...")
+    names = _contract_names(pdf_paths)
+    parse_start = time.perf_counter()
+    jobs = []
+    with ProcessPoolExecutor(max_workers=max(1, min(args.parse_workers, len(pdf_paths)))) as executor:
+        futures = [executor.submit(_parse_contract, pdf_path) for pdf_path in pdf_paths]
+        for pdf_path, future in zip(pdf_paths, futures):
+            # One unreadable contract is reported and left out; the rest of the batch still runs
+            try:
+                pdf_hash, chunks, seconds = future.result()
+            except Exception as e:
+                print(f"Skipping {pdf_path}: {e}")
+                continue
+            if not chunks:
+                print(f"Skipping {pdf_path}: no text could be parsed.")
+                continue
+            jobs.append(ContractJob(pdf_path, names[pdf_path], pdf_hash, chunks, seconds))
+            # Parsed in a worker process, so its latency is recorded here
+            telemetry.observe("parse_contract", seconds, contract=jobs[-1].namespace)
+    parse_wall = time.perf_counter() - parse_start
+    
+    # Clients, caches and the compiled graph are created once and shared by every contract
+    llm_cache = None if args.no_llm_cache else LLMResponseCache()
+    rate_limiter = RateLimiter(args.rpm, args.tpm) if (args.rpm or args.tpm) else None
+    vs_manager = VectorStoreManager()
+    triage = ClauseTriage(args.triage_model, args.triage_confidence, cache=llm_cache, rate_limiter=rate_limiter) if args.triage else None
+    workflow = AuditWorkflow(rate_limiter=rate_limiter, llm_cache=llm_cache, vs_manager=vs_manager, triage=triage)
+    app = workflow.build_graph()
+    summarizer = SummarizerAgent(llm_cache=llm_cache)
+    
+    if not args.skip_ingest:
+        print("Indexing...")
+        for job in jobs:
+            with telemetry.contract(job.namespace), telemetry.span("ingest"):
+                quote_index = QuoteIndex()
+                quote_index.add_chunks(job.chunks)
+                vs_manager.for_namespace(job.namespace).upsert_stream([job.chunks], prune=True)
+                quote_index.save(QuoteIndex.path_for(job.namespace))
+    
+    # --- PHASE 2: AUDIT LOOP (one queue across all contracts) ---
+    print("\n[Phase 2] Running Critic-Reflector Audit Loop...")
+    outputs = [ContractOutputs(job, args.output_dir, args.resume) for job in jobs]
+    pending = []
+    resumed = 0
+    for j, job in enumerate(jobs):
+        done = outputs[j].completed() if args.resume else [None] * len(job.clauses)
+        for k, clause in enumerate(job.clauses):
+            if done[k]:
+                outputs[j].write(k, done[k], record=False)
+                resumed += 1
+            else:
+                pending.append((j, k))
+    if args.resume:
+        print(f"Resuming: {resumed} clauses already completed by a previous run.")
+    
+    # Dedup: shared boilerplate is audited once for the whole batch, and verdicts from earlier runs are reused
+    deduplicator = None
+    duplicates: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+    if args.dedup:
+        deduplicator = ClauseDeduplicator(VerdictStore(workflow.verdict_version()))
+        representatives, reused = [], 0
+        for group in deduplicator.group([jobs[j].clauses[k] for j, k in pending]):
+            group = [pending[g] for g in group]
+            stored = deduplicator.lookup(jobs[group[0][0]].clauses[group[0][1]])
+            if stored:
+                for j, k in group:
+                    outputs[j].write(k, assign(stored, jobs[j].clauses[k]))
+                reused += len(group)
+            else:
+                representatives.append(group[0])
+                duplicates[group[0]] = group[1:]
+        print(f"Dedup: {len(pending)} clauses -> {len(representatives)} representatives, {reused} verdicts reused from earlier runs.")
+        pending = representatives
+    
+    states = [initial_state(jobs[j].clauses[k], jobs[j].namespace) for j, k in pending]
+    owners = pending
+    print(f"Queued {len(states)} clauses from {len(jobs)} contracts.")
+    
+    audit_start = time.perf_counter()
+    
+    def on_finding(i: int, finding: Dict[str, Any], verification: Optional[Dict[str, Any]]):
+        j, k = owners[i]
+        outputs[j].write(k, finding)
+        jobs[j].audit_seconds = time.perf_counter() - audit_start
+        if deduplicator:
+            deduplicator.remember(jobs[j].clauses[k], finding, bool(verification and verification.get("verified")))
+            for dj, dk in duplicates[(j, k)]:
+                outputs[dj].write(dk, assign(finding, jobs[dj].clauses[dk]))
+                jobs[dj].audit_seconds = jobs[j].audit_seconds
+    
+    # Contracts fully resumed or served by stored verdicts are already complete
+    for contract in outputs:
+        contract.finish_if_done()
+    try:
+        findings = asyncio.run(audit_states_async(app, states, args.concurrency, on_finding))
+        # Clauses whose audit raised never reached on_finding; their contracts finish here
+        for owner, finding in zip(owners, findings):
+            if not finding:
+                for j, _ in [owner] + duplicates.get(owner, []):
+                    outputs[j].fail()
+    finally:
+        for contract in outputs:
+            contract.close()
+    audit_wall = time.perf_counter() - audit_start
+    
+    # Checkpoints are kept only for contracts with clauses left to retry
+    failed = sum(1 for contract in outputs if contract.failed)
+    if failed:
+        print(f"{failed} contracts had failed clauses; rerun with --resume to retry only those.")
+    
+    # --- PHASE 3: REPORTING ---
+    print("\n[Phase 3] Generating Compliance Reports...")
+    for job, contract in zip(jobs, outputs):
+        output_filename = os.path.join(args.output_dir, f"audit_report_{job.name}.md")
+        with telemetry.contract(job.namespace), telemetry.span("report"):
+            summarizer.write_report_from_jsonl(job.name, contract.jsonl_path, output_filename)
+    
+    # --- THROUGHPUT ---
+    print("\n--- Batch Throughput ---")
+    for job in jobs:
+        clause_rate = len(job.clauses) / job.audit_seconds if job.audit_seconds else 0.0
+        print(f"{job.name}: {job.pages} pages parsed in {job.parse_seconds:.1f}s, "
+              f"{len(job.clauses)} clauses audited by {job.audit_seconds:.1f}s ({clause_rate:.2f} clauses/s)")
+    total_pages = sum(job.pages for job in jobs)
+    print(f"Total: {len(jobs)} contracts, {total_pages} pages in {parse_wall:.1f}s ({total_pages / parse_wall if parse_wall else 0:.1f} pages/s), "
+          f"{len(states)} clauses in {audit_wall:.1f}s ({len(states) / audit_wall if audit_wall else 0:.2f} clauses/s)")
+    if llm_cache:
+        stats = llm_cache.stats()
+        print(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses ({stats['entries']} entries)")
+    if triage:
+        print(triage.summary())
+    
+    costs = telemetry.cost_by_contract()
+    print(f"Estimated LLM cost: ${sum(costs.values()):.4f} total")
+    for job in jobs:
+        print(f"  {job.name}: ${costs.get(job.namespace, 0.0):.4f}")
+    if args.telemetry_dir:
+        prometheus_path, trace_path = telemetry.export(args.telemetry_dir, "batch")
+        print(f"Metrics written to {prometheus_path}, trace to {trace_path}")
+
+if __name__ == "__main__":
+    main()
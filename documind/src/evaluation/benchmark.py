@@ -0,0 +1,163 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from src.ingestion.pdf_parser import PDFProcessor
+from src.ingestion.vector_store import VectorStoreManager
+from src.ingestion.quote_index import QuoteIndex
+from src.analysis.critic_agent import CriticAgent
+from src.analysis.langgraph_workflow import AuditWorkflow
+from src.analysis.audit_runner import initial_state
+from src.evaluation.fakes import FakeChatModel, FakeEmbeddings
+from src.evaluation.synthetic_pdf import write_contract_pdf
+
+NAMESPACE = "benchmark"
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    if len(samples) == 1:
+        return {"p50": samples[0], "p90": samples[0], "p99": samples[0], "max": samples[0]}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": cuts[49], "p90": cuts[89], "p99": cuts[98], "max": max(samples)}
+
+async def _audit_with_latencies(app, states: List[Dict[str, Any]], concurrency: int) -> List[float]:
+    """Runs the graph over `states` like audit_states_async, timing each clause from start to finish."""
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    loop.set_default_executor(executor)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def run_one(state):
+        async with semaphore:
+            start = time.perf_counter()
+            await app.ainvoke(state)
+            latencies.append(time.perf_counter() - start)
+
+    try:
+        await asyncio.gather(*(run_one(state) for state in states))
+    finally:
+        executor.shutdown(wait=False)
+    return latencies
+
+def run_benchmark(pages: int = 300, clauses_per_page: int = 6, parse_workers: int = 1, concurrency: int = 8,
+                  chat_latency_ms: float = 200.0, chat_jitter_ms: float = 100.0, embed_latency_ms: float = 50.0,
+                  max_clauses: Optional[int] = None, seed: int = 0, workdir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Runs parse, embed, upsert and audit stages against synthetic data with stand-in models.
+
+    Everything runs offline: the PDF is generated locally, the chat and embedding models are
+    deterministic fakes with simulated latency, and vectors go to the local memory-mapped index.
+    All caches live in a fresh directory so every run measures the same (cold) work.
+
+    Returns:
+        Dict of throughput and latency metrics.
+
+    Raises:
+        RuntimeError: If the synthetic PDF yields no chunks or no clauses to audit, since
+            throughput figures over nothing would look like a (very fast) success.
+    """
+    workdir = workdir or tempfile.mkdtemp(prefix="documind_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    # Cache paths are resolved when components are created, so this isolates the run's caches
+    os.environ["DOCUMIND_CACHE_DIR"] = tempfile.mkdtemp(prefix="cache_", dir=workdir)
+    os.environ.pop("DOCUMIND_LAW_INDEX", None)
+
+    results: Dict[str, Any] = {
+        "pages": pages, "parse_workers": parse_workers, "concurrency": concurrency,
+        "chat_latency_ms": chat_latency_ms, "embed_latency_ms": embed_latency_ms, "seed": seed,
+    }
+
+    # Synthetic PDFs are reused across runs with the same parameters
+    pdf_path = os.path.join(workdir, f"synthetic_{pages}p_{clauses_per_page}c_seed{seed}.pdf")
+    if not os.path.exists(pdf_path):
+        write_contract_pdf(pdf_path, pages, clauses_per_page, seed)
+
+    # 1. Parsing
+    start = time.perf_counter()
+    chunks = PDFProcessor().parse_pdf(pdf_path, workers=parse_workers)
+    elapsed = time.perf_counter() - start
+    if not chunks:
+        raise RuntimeError(f"Parsing {pdf_path} produced no chunks")
+    results["chunks"] = len(chunks)
+    results["parse_seconds"] = elapsed
+    results["parse_pages_per_sec"] = pages / elapsed if elapsed else 0.0
+
+    # 2. Embedding (cold cache, so every text reaches the embedding model)
+    embeddings = FakeEmbeddings(latency_ms=embed_latency_ms)
+    vs_manager = VectorStoreManager(namespace=NAMESPACE, backend="local", embeddings=embeddings)
+    texts = [c['raw_text'] for c in chunks]
+    start = time.perf_counter()
+    for i in range(0, len(texts), 100):
+        vs_manager._embed_documents(texts[i:i + 100])
+    elapsed = time.perf_counter() - start
+    results["embeddings_per_sec"] = len(texts) / elapsed if elapsed else 0.0
+
+    # 3. Upsert (embeddings now come from the cache, isolating the index write path)
+    windows = [chunks[i:i + 8 * clauses_per_page] for i in range(0, len(chunks), 8 * clauses_per_page)]
+    start = time.perf_counter()
+    total = vs_manager.upsert_stream(windows, prune=True)
+    elapsed = time.perf_counter() - start
+    results["upsert_vectors_per_sec"] = total / elapsed if elapsed else 0.0
+
+    quote_index = QuoteIndex()
+    quote_index.add_chunks(chunks)
+    quote_index.save(QuoteIndex.path_for(NAMESPACE))
+
+    # 4. Audit loop (critic + reflector graph per clause)
+    chat = FakeChatModel(latency_ms=chat_latency_ms, jitter_ms=chat_jitter_ms, seed=seed)
+    workflow = AuditWorkflow(vs_manager=vs_manager, critic_agent=CriticAgent(model_name=chat.model, llm=chat))
+    app = workflow.build_graph()
+    clauses = [c for c in chunks if c['clause_id'] != "General"][:max_clauses]
+    if not clauses:
+        raise RuntimeError(f"Parsing {pdf_path} found no clauses to audit")
+    states = [initial_state(clause, NAMESPACE) for clause in clauses]
+    start = time.perf_counter()
+    latencies = asyncio.run(_audit_with_latencies(app, states, concurrency))
+    elapsed = time.perf_counter() - start
+    results["clauses_audited"] = len(clauses)
+    results["audit_clauses_per_sec"] = len(clauses) / elapsed if elapsed else 0.0
+    results["clause_latency_ms"] = {k: v * 1000 for k, v in _percentiles(latencies).items()}
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="DocuMind: Offline performance benchmark")
+    parser.add_argument("--pages", type=int, default=300, help="Pages in the synthetic contract")
+    parser.add_argument("--clauses-per-page", type=int, default=6)
+    parser.add_argument("--parse-workers", type=int, default=1)
+    parser.add_argument("--concurrency", type=int, default=8, help="Clauses audited concurrently")
+    parser.add_argument("--chat-latency-ms", type=float, default=200.0, help="Simulated latency per chat completion")
+    parser.add_argument("--chat-jitter-ms", type=float, default=100.0, help="Extra deterministic per-prompt latency, up to this much")
+    parser.add_argument("--embed-latency-ms", type=float, default=50.0, help="Simulated latency per embedding request")
+    parser.add_argument("--max-clauses", type=int, default=None, help="Audit at most this many clauses")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", default=None, help="Where the synthetic PDF and caches are kept (default: a temp dir)")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.pages, args.clauses_per_page, args.parse_workers, args.concurrency,
+                            args.chat_latency_ms, args.chat_jitter_ms, args.embed_latency_ms,
+                            args.max_clauses, args.seed, args.workdir)
+
+    latency = results["clause_latency_ms"]
+    print("\n--- DocuMind Benchmark ---")
+    print(f"Parse:   {results['parse_pages_per_sec']:.1f} pages/s ({results['pages']} pages, {results['chunks']} chunks)")
+    print(f"Embed:   {results['embeddings_per_sec']:.1f} embeddings/s")
+    print(f"Upsert:  {results['upsert_vectors_per_sec']:.1f} vectors/s")
+    print(f"Audit:   {results['audit_clauses_per_sec']:.2f} clauses/s ({results['clauses_audited']} clauses, concurrency {results['concurrency']})")
+    print(f"Clause latency: p50 {latency['p50']:.0f}ms, p90 {latency['p90']:.0f}ms, p99 {latency['p99']:.0f}ms, max {latency['max']:.0f}ms")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json_path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,32 @@
+import argparse
 import json
 import os
-from typing import List, Dict
-from langchain_openai import ChatOpenAI
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Set, Tuple
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
+from src.utils.llm_provider import get_provider
+from src.evaluation.synthetic_pdf import markdown_pages, count_pages, filler_lines, render_markdown_pdf
+
+# Padding articles are numbered from here, clear of the generated contract's own clause numbers
+FILLER_FIRST_ARTICLE = 100
+
+def _slug(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", title.lower()).strip("_") or "contract"
+
+def pad_to_pages(markdown: str, target_pages: int, seed: int = 0) -> str:
+    """
+    Appends compliant boilerplate articles, one per page, until the contract renders to
+    `target_pages` PDF pages. Page breaks are written as "-----" so the Markdown and the
+    PDF paginate the same way.
+    """
+    missing = target_pages - count_pages(markdown_pages(markdown))
+    if missing <= 0:
+        return markdown
+    filler = filler_lines(missing, FILLER_FIRST_ARTICLE, seed=seed)
+    return markdown.rstrip() + "\n\n-----\n\n" + "\n\n-----\n\n".join("\n\n".join(lines) for lines in filler) + "\n"
 
 # Define Schema for Synthetic Data
 class SyntheticContract(BaseModel):
@@ -18,7 +40,7 @@ class GoldenDatasetGenerator:
     to create a 'Golden Dataset' for evaluation.
     """
     def __init__(self):
-        self.llm = ChatOpenAI(model="gpt-4o", temperature=0.7)
+        self.llm = get_provider().chat("gpt-4o", temperature=0.7)
         self.parser = JsonOutputParser(pydantic_object=SyntheticContract)
         
         self.prompt = ChatPromptTemplate.from_messages([
@@ -36,7 +58,7 @@ class GoldenDatasetGenerator:
                - content (the markdown text)
                - known_violations (list mapping clause ID to the violation type).
             """),
-            ("user", "Generate a contract now.")
+            ("user", "Generate contract {variant} of {total}. Use a different employer, job title and industry from the other contracts.")
         ])
         
         self.chain = self.prompt | self.llm | self.parser
@@ -45,26 +67,13 @@ class GoldenDatasetGenerator:
         """Generates a single sample and saves it."""
         print("Generating synthetic contract...")
         try:
-            data = self.chain.invoke({})
+            data = self.chain.invoke({"variant": 1, "total": 1})
             
             os.makedirs(output_dir, exist_ok=True)
+            safe_title = self._unique_slug(data['title'], output_dir, set())
             
-            # Save the Text (as PDF simulation - actually just MD for now, or text)
-            # For the pipeline, we need PDF. Since generating PDF programmatically is tedious,
-            # we will save as Markdown and let the user convert, or mock the parser for this test.
-            # For seamlessness, let's save as .md and assume parser handles it or we convert.
-            # Actually, `pymupdf4llm` reads PDFs.
-            # We'll save the raw text and the ground truth metadata.
-            
-            safe_title = data['title'].replace(" ", "_").lower()
-            
-            # Save Content
-            with open(f"{output_dir}/{safe_title}.md", "w", encoding="utf-8") as f:
-                f.write(data['content'])
-                
-            # Save Ground Truth
-            with open(f"{output_dir}/{safe_title}_truth.json", "w", encoding="utf-8") as f:
-                json.dump(data['known_violations'], f, indent=2)
+            # The Markdown is read directly by PDFProcessor; render a PDF with generate_bulk
+            self._save(output_dir, safe_title, data['content'], data['known_violations'])
                 
             print(f"Generated: {safe_title}")
             return safe_title, data['known_violations']
@@ -73,6 +82,76 @@ class GoldenDatasetGenerator:
             print(f"Error generating dataset: {e}")
             return None, None
 
-if __name__ == "__main__":
+    def generate_bulk(self, count: int, output_dir: str = "data/golden_dataset", target_pages: Optional[int] = None,
+                      concurrency: int = 8, render_pdf: bool = True, render_workers: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        Generates `count` contracts with up to `concurrency` LLM requests in flight.
+        
+        Args:
+            count: Number of contracts.
+            output_dir: Where the .md, .pdf and _truth.json files are written.
+            target_pages: Pad each contract with compliant boilerplate to this many pages.
+            concurrency: Generation requests sent at the same time.
+            render_pdf: Also render each contract to PDF (locally, across a process pool).
+            render_workers: Processes used for rendering (default: one per CPU).
+            
+        Returns:
+            (name, pages) for every contract written; pages is 0 when no PDF was rendered.
+        """
+        print(f"Generating {count} synthetic contracts ({concurrency} at a time)...")
+        inputs = [{"variant": i + 1, "total": count} for i in range(count)]
+        outputs = self.chain.batch(inputs, config={"max_concurrency": concurrency}, return_exceptions=True)
+        
+        os.makedirs(output_dir, exist_ok=True)
+        taken: Set[str] = set()
+        saved: List[Tuple[str, str]] = []
+        for i, data in enumerate(outputs):
+            if isinstance(data, Exception):
+                print(f"Error generating contract {i + 1}: {data}")
+                continue
+            name = self._unique_slug(data['title'], output_dir, taken)
+            content = pad_to_pages(data['content'], target_pages, seed=i) if target_pages else data['content']
+            self._save(output_dir, name, content, data['known_violations'])
+            saved.append((name, content))
+        
+        if not render_pdf:
+            print(f"Generated {len(saved)} contracts.")
+            return [(name, 0) for name, _ in saved]
+        
+        # Rendering is CPU-bound, so it runs in processes rather than alongside the requests
+        with ProcessPoolExecutor(max_workers=render_workers) as executor:
+            pages = list(executor.map(render_markdown_pdf, [os.path.join(output_dir, f"{name}.pdf") for name, _ in saved],
+                                      [content for _, content in saved]))
+        print(f"Generated {len(saved)} contracts ({sum(pages)} PDF pages).")
+        return [(name, n) for (name, _), n in zip(saved, pages)]
+
+    def _unique_slug(self, title: str, output_dir: str, taken: Set[str]) -> str:
+        """Filename stem for `title`, suffixed (_2, _3, ...) if used in this run or already on disk."""
+        base = _slug(title)
+        name, n = base, 1
+        while name in taken or os.path.exists(os.path.join(output_dir, f"{name}_truth.json")):
+            n += 1
+            name = f"{base}_{n}"
+        taken.add(name)
+        return name
+
+    def _save(self, output_dir: str, name: str, content: str, known_violations: List[Dict[str, Any]]):
+        with open(os.path.join(output_dir, f"{name}.md"), "w", encoding="utf-8") as f:
+            f.write(content)
+        with open(os.path.join(output_dir, f"{name}_truth.json"), "w", encoding="utf-8") as f:
+            json.dump(known_violations, f, indent=2)
+
+def main():
+    parser = argparse.ArgumentParser(description="DocuMind: Generate a synthetic golden dataset")
+    parser.add_argument("--count", type=int, default=1, help="Number of contracts to generate")
+    parser.add_argument("--output-dir", default="data/golden_dataset")
+    parser.add_argument("--target-pages", type=int, default=None, help="Pad each contract with compliant boilerplate to this many pages")
+    parser.add_argument("--concurrency", type=int, default=8, help="Generation requests sent at the same time")
+    parser.add_argument("--no-pdf", action="store_true", help="Only write Markdown, without rendering PDFs")
+    args = parser.parse_args()
+    
     gen = GoldenDatasetGenerator()
-    gen.generate_sample()
+    gen.generate_bulk(args.count, args.output_dir, args.target_pages, args.concurrency, render_pdf=not args.no_pdf)
+
+if __name__ == "__main__":
+    main()
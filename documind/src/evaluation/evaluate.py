@@ -1,76 +1,225 @@
+import argparse
 import os
 import json
+import re
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
 from glob import glob
-from typing import List
-# Import pipeline components
-# In a real run, we would import the main workflow. 
-# For now, we stub the actual execution to demonstrate the evaluation logic.
+from typing import List, Dict, Any, Optional, Tuple
+
+from src.utils.telemetry import telemetry
+
+# Critic statuses that count as "the system flagged this clause"
+FLAGGED_STATUSES = ("VIOLATION", "MISSING")
+
+_ID_PREFIX = re.compile(r'^(?:article|section|clause)\s+', re.IGNORECASE)
+_WORD = re.compile(r"[a-z0-9]+")
+
+def normalize_clause_id(clause_id: str) -> str:
+    """'Clause 4.', 'clause 4' and '4' all normalize to '4'; '(a)' stays '(a)'."""
+    return _ID_PREFIX.sub("", str(clause_id).strip()).rstrip(".:").lower()
+
+def _words(text: str) -> set:
+    return set(_WORD.findall(text.lower()))
+
+def _similarity(truth: Dict[str, Any], finding: Dict[str, Any]) -> float:
+    """Share of the truth item's words (clause id and violation type) found in the finding."""
+    expected = _words(f"{truth.get('clause_id', '')} {truth.get('expected_violation_type', '')}")
+    if not expected:
+        return 0.0
+    found = _words(" ".join(str(finding.get(k, "")) for k in ("clause_id", "law_reference", "reasoning", "source_verification")))
+    return len(expected & found) / len(expected)
+
+def match_findings(truth: List[Dict[str, Any]], findings: List[Dict[str, Any]], threshold: float = 0.5) -> List[Tuple[int, int]]:
+    """
+    One-to-one matching of known violations to flagged findings.
+
+    Findings are first matched on normalized clause id (a dict lookup per truth item).
+    Whatever is left is matched greedily on the similarity matrix, best pair first,
+    keeping pairs scoring at least `threshold`.
+
+    Returns:
+        (truth_index, finding_index) pairs.
+    """
+    by_id: Dict[str, List[int]] = {}
+    for j, finding in enumerate(findings):
+        by_id.setdefault(normalize_clause_id(finding.get("clause_id", "")), []).append(j)
+
+    pairs = []
+    used = set()
+    unmatched = []
+    for i, item in enumerate(truth):
+        candidates = [j for j in by_id.get(normalize_clause_id(item.get("clause_id", "")), []) if j not in used]
+        if candidates:
+            pairs.append((i, candidates[0]))
+            used.add(candidates[0])
+        else:
+            unmatched.append(i)
+
+    remaining = [j for j in range(len(findings)) if j not in used]
+    scored = sorted(
+        ((_similarity(truth[i], findings[j]), i, j) for i in unmatched for j in remaining),
+        reverse=True
+    )
+    matched_truth = set()
+    for score, i, j in scored:
+        if score < threshold:
+            break
+        if i in matched_truth or j in used:
+            continue
+        pairs.append((i, j))
+        matched_truth.add(i)
+        used.add(j)
+    return pairs
 
 class Evaluator:
     """
-    Runs the DocuMind pipeline against the Golden Dataset and calculates accuracy.
+    Runs the DocuMind pipeline against the Golden Dataset and calculates precision and recall.
+
+    Each document is parsed (Markdown directly), indexed into its own namespace and audited
+    through the real critic/reflector graph. Documents are processed in a thread pool and
+    share one workflow, so the LLM clients, caches and rate limiter are shared as in batch mode.
     """
-    def __init__(self, dataset_dir: str = "data/golden_dataset"):
+    # Recall the system is expected to reach on the golden dataset
+    TARGET_RECALL = 94.0
+
+    def __init__(self, dataset_dir: str = "data/golden_dataset", workers: int = 4, concurrency: int = 4,
+                 threshold: float = 0.5, workflow=None, vs_manager=None):
         self.dataset_dir = dataset_dir
+        self.workers = workers
+        self.concurrency = concurrency
+        self.threshold = threshold
+        self.workflow = workflow
+        self.vs_manager = vs_manager
+
+    def _documents(self) -> List[Tuple[str, str, List[Dict[str, Any]]]]:
+        """(name, document path, known violations) for every truth file with a matching document."""
+        documents = []
+        for truth_file in sorted(glob(f"{self.dataset_dir}/*_truth.json")):
+            base_name = os.path.basename(truth_file).replace("_truth.json", "")
+            doc_path = next((p for p in (os.path.join(self.dataset_dir, f"{base_name}{ext}") for ext in (".md", ".pdf")) if os.path.exists(p)), None)
+            if doc_path is None:
+                print(f"Skipping {base_name}: no document found for its truth file.")
+                continue
+            with open(truth_file, "r", encoding="utf-8") as f:
+                documents.append((base_name, doc_path, json.load(f)))
+        return documents
 
-    def run_evaluation(self):
+    def _audit_document(self, app, name: str, doc_path: str) -> Tuple[List[Dict[str, Any]], float]:
         """
-        Iterates through truth files, runs the audit on corresponding docs, 
-        and compares results.
+        Runs ingestion and the audit loop on one document.
+
+        Returns:
+            (flagged findings, seconds taken)
         """
-        truth_files = glob(f"{self.dataset_dir}/*_truth.json")
-        if not truth_files:
+        from src.ingestion.pdf_parser import PDFProcessor
+        from src.ingestion.quote_index import QuoteIndex
+        from src.analysis.audit_runner import run_audit
+
+        namespace = f"eval_{name.lower()}"
+        start = time.perf_counter()
+        with telemetry.contract(namespace):
+            chunks = PDFProcessor().parse_pdf(doc_path)
+            self.vs_manager.for_namespace(namespace).upsert_stream([chunks], prune=True)
+            quote_index = QuoteIndex()
+            quote_index.add_chunks(chunks)
+            quote_index.save(QuoteIndex.path_for(namespace))
+
+            clauses = [c for c in chunks if c['clause_id'] != "General"]
+            findings = run_audit(app, clauses, namespace, concurrency=self.concurrency)
+        flagged = [f for f in findings if f and f.get("status") in FLAGGED_STATUSES]
+        return flagged, time.perf_counter() - start
+
+    def run_evaluation(self) -> Optional[Dict[str, Any]]:
+        """
+        Audits every document in the dataset and compares the flagged clauses with the known violations.
+
+        Returns:
+            Dict with per-document and overall precision, recall and latency (None if there is no dataset).
+        """
+        documents = self._documents()
+        if not documents:
             print("No golden dataset found. Run dataset_generator.py first.")
-            return
-
-        total_violations = 0
-        detected_violations = 0
-        
-        print(f"Starting Evaluation on {len(truth_files)} documents...")
-        
-        for truth_file in truth_files:
-            base_name = os.path.basename(truth_file).replace("_truth.json", "")
-            doc_path = os.path.join(self.dataset_dir, f"{base_name}.md")
-            
-            # Load Ground Truth
-            with open(truth_file, "r") as f:
-                known_violations = json.load(f)
-            
-            # Run System (Stubbed for now)
-            # system_findings = run_audit_on_text(doc_path) 
-            # For demonstration, let's pretend we detected 2 out of 3.
-            system_findings = self._mock_system_run(known_violations)
-            
-            # Compare
-            matched = 0
-            for v in known_violations:
-                # specific matching logic (by clause_id or semantic similarity)
-                if v['clause_id'] in [f['clause_id'] for f in system_findings]:
-                     matched += 1
-            
-            total_violations += len(known_violations)
-            detected_violations += matched
-            
-            print(f"Doc: {base_name} | Accuracy: {matched}/{len(known_violations)}")
-
-        if total_violations > 0:
-            accuracy = (detected_violations / total_violations) * 100
-            print(f"\n--- Final Results ---")
-            print(f"Total violations in dataset: {total_violations}")
-            print(f"Detected violations: {detected_violations}")
-            print(f"System Accuracy: {accuracy:.2f}%")
-            if accuracy >= 94:
-                print("✅ TARGET REACHED (>=94%)")
-            else:
-                print("❌ TARGET FAILED (<94%)")
-        else:
+            return None
+
+        from src.ingestion.vector_store import VectorStoreManager
+        from src.analysis.langgraph_workflow import AuditWorkflow
+
+        if self.vs_manager is None:
+            self.vs_manager = VectorStoreManager(namespace="evaluation")
+        if self.workflow is None:
+            self.workflow = AuditWorkflow(vs_manager=self.vs_manager)
+        app = self.workflow.build_graph()
+
+        print(f"Starting Evaluation on {len(documents)} documents ({self.workers} at a time)...")
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            runs = list(executor.map(lambda doc: self._audit_document(app, doc[0], doc[1]), documents))
+
+        per_document = []
+        for (name, _, truth), (flagged, seconds) in zip(documents, runs):
+            matched = len(match_findings(truth, flagged, self.threshold))
+            per_document.append({
+                "document": name,
+                "known_violations": len(truth),
+                "flagged": len(flagged),
+                "true_positives": matched,
+                "latency_seconds": seconds,
+            })
+            print(f"Doc: {name} | Detected: {matched}/{len(truth)} | Flagged: {len(flagged)} | {seconds:.1f}s")
+
+        total_truth = sum(d["known_violations"] for d in per_document)
+        total_flagged = sum(d["flagged"] for d in per_document)
+        true_positives = sum(d["true_positives"] for d in per_document)
+        latencies = [d["latency_seconds"] for d in per_document]
+        results = {
+            "documents": per_document,
+            "precision": true_positives / total_flagged * 100 if total_flagged else 0.0,
+            "recall": true_positives / total_truth * 100 if total_truth else 0.0,
+            "latency_seconds": {"median": statistics.median(latencies), "max": max(latencies)},
+        }
+
+        print(f"\n--- Final Results ---")
+        print(f"Total violations in dataset: {total_truth}")
+        print(f"Detected violations: {true_positives} (of {total_flagged} flagged)")
+        print(f"Precision: {results['precision']:.2f}%")
+        print(f"Recall: {results['recall']:.2f}%")
+        print(f"Per-document latency: median {results['latency_seconds']['median']:.1f}s, max {results['latency_seconds']['max']:.1f}s")
+        if total_truth == 0:
             print("No violations to test.")
+        elif results["recall"] >= self.TARGET_RECALL:
+            print(f"✅ TARGET REACHED (>={self.TARGET_RECALL:.0f}%)")
+        else:
+            print(f"❌ TARGET FAILED (<{self.TARGET_RECALL:.0f}%)")
+        return results
+
+def main():
+    parser = argparse.ArgumentParser(description="DocuMind: Evaluate the audit pipeline on the golden dataset")
+    parser.add_argument("--dataset-dir", default="data/golden_dataset")
+    parser.add_argument("--workers", type=int, default=4, help="Documents audited at the same time")
+    parser.add_argument("--concurrency", type=int, default=4, help="Clauses audited concurrently within each document")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Minimum similarity for matching a finding to a known violation by content")
+    parser.add_argument("--offline", action="store_true", help="Use the deterministic stand-in models and the local vector index (no API calls)")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    workflow, vs_manager = None, None
+    if args.offline:
+        from src.ingestion.vector_store import VectorStoreManager
+        from src.analysis.critic_agent import CriticAgent
+        from src.analysis.langgraph_workflow import AuditWorkflow
+        from src.evaluation.fakes import FakeChatModel, FakeEmbeddings
+
+        chat = FakeChatModel()
+        vs_manager = VectorStoreManager(namespace="evaluation", backend="local", embeddings=FakeEmbeddings())
+        workflow = AuditWorkflow(vs_manager=vs_manager, critic_agent=CriticAgent(model_name=chat.model, llm=chat))
 
-    def _mock_system_run(self, truth):
-        """Simulates the system detecting stuff for the sake of the script working."""
-        # Return a subset to simulate <100% accuracy
-        return list(truth)[0:-1] if len(truth) > 1 else list(truth)
+    evaluator = Evaluator(args.dataset_dir, args.workers, args.concurrency, args.threshold, workflow, vs_manager)
+    results = evaluator.run_evaluation()
+    if results and args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json_path}")
 
 if __name__ == "__main__":
-    evaluator = Evaluator()
-    evaluator.run_evaluation()
+    main()
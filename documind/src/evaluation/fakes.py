@@ -0,0 +1,105 @@
+import json
+import re
+import time
+from typing import List, Dict, Any, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from src.utils.hashing import text_hash
+from src.utils.rate_limiter import estimate_tokens
+
+_ITEM_PATTERN = re.compile(r"\[Item (\d+)\]\s*Clause ID: (.*?)\s*Clause Text: (.*?)(?=\s*\[Item \d+\]|\s*Relevant Laws)", re.DOTALL)
+_CLAUSE_PATTERN = re.compile(r"Clause ID: (.*?)\s*Clause Text: (.*?)\s*Relevant Laws", re.DOTALL)
+_WORD_PATTERN = re.compile(r"\w+")
+
+def _unit_interval(*parts: str) -> float:
+    """Deterministic pseudo-random number in [0, 1) derived from the given strings."""
+    return int(text_hash(*parts)[:8], 16) / 16 ** 8
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline stand-in for the OpenAI chat models used by the critic, redliner and summarizer.
+
+    Answers are derived from the prompt alone, so runs are reproducible regardless of
+    concurrency: critic prompts get a verdict chosen by hashing the clause text and an exact
+    quote of its first words (which the Reflector can verify), redline and summary prompts
+    get fixed text. Each call sleeps `latency_ms` plus up to `jitter_ms` to mimic the API.
+    """
+    model: str = "fake-chat"
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    violation_rate: float = 0.25
+    quote_words: int = 12
+    seed: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "documind-fake-chat"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None, **kwargs) -> ChatResult:
+        prompt = "\n".join(str(m.content) for m in messages)
+        delay = self.latency_ms + self.jitter_ms * _unit_interval(str(self.seed), prompt)
+        if delay:
+            time.sleep(delay / 1000)
+
+        content = self.respond(messages[-1].content if messages else "")
+        usage = {
+            "input_tokens": estimate_tokens(prompt),
+            "output_tokens": estimate_tokens(content),
+            "total_tokens": estimate_tokens(prompt) + estimate_tokens(content),
+        }
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content, usage_metadata=usage))])
+
+    def _finding(self, clause_id: str, clause_text: str) -> Dict[str, Any]:
+        violation = _unit_interval(str(self.seed), clause_text) < self.violation_rate
+        return {
+            "clause_id": clause_id.strip(),
+            "status": "VIOLATION" if violation else "COMPLIANT",
+            "confidence": 0.9,
+            "law_reference": "Synthetic Law Art. 1",
+            "reasoning": "Deterministic benchmark verdict.",
+            "source_verification": " ".join(clause_text.split()[:self.quote_words]),
+        }
+
+    def respond(self, prompt: str) -> str:
+        items = _ITEM_PATTERN.findall(prompt)
+        if items:
+            findings = [{"item": int(n), **self._finding(cid, text)} for n, cid, text in items]
+            return json.dumps({"findings": findings})
+        clause = _CLAUSE_PATTERN.search(prompt)
+        if clause:
+            return json.dumps(self._finding(clause.group(1), clause.group(2)))
+        if "Rewritten Clause" in prompt:
+            return "The parties agree to the revised terms in accordance with applicable law."
+        return "Synthetic executive summary for benchmarking."
+
+class FakeEmbeddings(Embeddings):
+    """
+    Offline stand-in for OpenAI embeddings: a deterministic hashed bag-of-words vector per text.
+    Texts sharing words get similar vectors, so vector search still behaves sensibly.
+    Each call sleeps `latency_ms` plus `per_text_ms` for every text embedded.
+    """
+    def __init__(self, dimension: int = 1536, latency_ms: float = 0.0, per_text_ms: float = 0.0, model: str = "fake-embedding"):
+        self.dimension = dimension
+        self.latency_ms = latency_ms
+        self.per_text_ms = per_text_ms
+        self.model = model
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for word in _WORD_PATTERN.findall(text.lower()):
+            h = int(text_hash(word)[:8], 16)
+            vector[h % self.dimension] += 1.0 if h & (1 << 31) else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        delay = self.latency_ms + self.per_text_ms * len(texts)
+        if delay:
+            time.sleep(delay / 1000)
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
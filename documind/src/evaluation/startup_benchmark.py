@@ -0,0 +1,90 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Dict, Any, Optional, Tuple
+
+# (label, interpreter arguments) measured by default
+TARGETS = [
+    ("main --help", ["-m", "src.main", "--help"]),
+    ("batch --help", ["-m", "src.batch", "--help"]),
+    ("import pdf_parser", ["-c", "import src.ingestion.pdf_parser"]),
+    ("import vector_store", ["-c", "import src.ingestion.vector_store"]),
+    ("import langgraph_workflow", ["-c", "import src.analysis.langgraph_workflow"]),
+]
+
+def time_command(args: List[str], runs: int = 5) -> List[float]:
+    """Wall-clock seconds of `python <args>` in fresh interpreters."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def slowest_imports(module: str, top: int = 10) -> List[Tuple[str, float]]:
+    """
+    Top-level-ish modules with the largest cumulative import time when importing `module`,
+    from the interpreter's -X importtime report.
+
+    Returns:
+        (module_name, milliseconds) pairs, slowest first.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=False)
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        # Only direct children of the requested module and their first level, to keep the list readable
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 2:
+            entries.append((name.strip(), int(cumulative) / 1000))
+    entries.sort(key=lambda e: -e[1])
+    return entries[:top]
+
+def run_startup_benchmark(runs: int = 5, targets: Optional[List[Tuple[str, List[str]]]] = None) -> Dict[str, Any]:
+    """
+    Times each target in fresh interpreters, so nothing is served from an already-warm import cache.
+
+    Returns:
+        Dict of label -> median and minimum milliseconds.
+    """
+    results = {}
+    for label, args in targets or TARGETS:
+        timings = time_command(args, runs)
+        results[label] = {"median_ms": statistics.median(timings) * 1000, "min_ms": min(timings) * 1000}
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="DocuMind: CLI startup and import-time benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreter runs per target")
+    parser.add_argument("--profile", default="src.main", help="Module whose slowest imports are listed")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Exit non-zero if 'main --help' takes longer than this (median)")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run_startup_benchmark(args.runs)
+    print("\n--- DocuMind Startup ---")
+    for label, timing in results.items():
+        print(f"{label:28s} median {timing['median_ms']:7.1f}ms   min {timing['min_ms']:7.1f}ms")
+
+    print(f"\nSlowest imports under {args.profile}:")
+    for name, ms in slowest_imports(args.profile):
+        print(f"  {ms:8.1f}ms  {name}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json_path}")
+
+    if args.budget_ms is not None and results["main --help"]["median_ms"] > args.budget_ms:
+        print(f"Startup budget exceeded: main --help took {results['main --help']['median_ms']:.0f}ms (budget {args.budget_ms:.0f}ms)")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import random
+import re
+import textwrap
+from typing import List, Tuple
+import pymupdf
+
+_TITLES = [
+    "Definitions", "Term of Employment", "Probation", "Remuneration", "Working Hours", "Annual Leave",
+    "Confidentiality", "Intellectual Property", "Termination", "Notice", "Non-Competition",
+    "Liability", "Governing Law", "Dispute Resolution", "Force Majeure", "Miscellaneous",
+]
+
+_CLAUSES = [
+    "The Employee shall serve a probation period of {n} months commencing on the Start Date.",
+    "Either Party may terminate this Agreement by giving the other Party not less than {n} days written notice.",
+    "The Employee shall be entitled to {n} working days of paid annual leave for each year of service.",
+    "The Employee shall not, for a period of {n} months after termination, engage in any competing business within the United Arab Emirates.",
+    "The Employer shall pay the Employee a basic monthly salary of AED {n},000 on or before the last working day of each month.",
+    "The Receiving Party shall keep confidential all Confidential Information and shall not disclose it to any third party without prior written consent.",
+    "All intellectual property created by the Employee in the course of employment shall vest in the Employer absolutely.",
+    "The normal working hours shall not exceed {n} hours per day or forty-eight hours per week, excluding rest periods.",
+    "Neither Party shall be liable for any failure to perform its obligations caused by an event of force majeure lasting more than {n} days.",
+    "This Agreement shall be governed by and construed in accordance with the laws of the United Arab Emirates.",
+    "Any dispute arising out of this Agreement shall first be referred to the competent labour authority within {n} days.",
+    "The Employee indemnifies the Employer against all losses, costs and claims arising from any breach of this Agreement.",
+]
+
+# Boilerplate with no terms a UAE labour-law audit should flag, used to pad generated contracts
+# to a target length without adding violations the ground truth doesn't know about
+_COMPLIANT_CLAUSES = [
+    "This Agreement shall be governed by and construed in accordance with the laws of the United Arab Emirates.",
+    "The Receiving Party shall keep confidential all Confidential Information and shall not disclose it to any third party without prior written consent.",
+    "Headings in this Agreement are for convenience only and shall not affect its interpretation.",
+    "Any notice under this Agreement shall be in writing and delivered by hand, courier or email to the address of the other Party.",
+    "If any provision of this Agreement is held invalid, the remaining provisions shall continue in full force and effect.",
+    "This Agreement may only be amended by a written instrument signed by both Parties.",
+    "No failure or delay by either Party in exercising any right under this Agreement shall operate as a waiver of that right.",
+    "This Agreement may be executed in counterparts, each of which shall be deemed an original.",
+]
+
+_MARKUP = re.compile(r"\*\*|__|`")
+_PAGE_BREAK = re.compile(r"\f|^-----\s*$", re.MULTILINE)
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+MARGIN = 56
+LINE_HEIGHT = 13
+WRAP_CHARS = 95
+
+def contract_lines(pages: int, clauses_per_page: int = 6, seed: int = 0) -> List[List[str]]:
+    """
+    Deterministic contract text: one article heading per page followed by numbered clauses.
+
+    Returns:
+        One list of lines per page; headings are prefixed with "#".
+    """
+    rng = random.Random(seed)
+    result = []
+    for page in range(1, pages + 1):
+        lines = [f"# ARTICLE {page}: {rng.choice(_TITLES).upper()}"]
+        for n in range(1, clauses_per_page + 1):
+            text = rng.choice(_CLAUSES).format(n=rng.randint(1, 120))
+            lines.append(f"{page}.{n} {text}")
+        result.append(lines)
+    return result
+
+def filler_lines(pages: int, first_article: int, clauses_per_page: int = 6, seed: int = 0) -> List[List[str]]:
+    """
+    Compliant boilerplate articles, one per page, numbered from `first_article`.
+
+    Returns:
+        One list of lines per page, in the same shape as contract_lines.
+    """
+    rng = random.Random(seed)
+    result = []
+    for article in range(first_article, first_article + pages):
+        lines = [f"# ARTICLE {article}: {rng.choice(_TITLES).upper()}"]
+        lines.extend(f"{article}.{n} {rng.choice(_COMPLIANT_CLAUSES)}" for n in range(1, clauses_per_page + 1))
+        result.append(lines)
+    return result
+
+def markdown_pages(markdown: str) -> List[List[str]]:
+    """
+    Splits Markdown into pages of plain lines (on the page breaks PDFProcessor recognizes),
+    dropping inline emphasis the PDF renderer can't show. Headings keep a "# " prefix.
+    """
+    pages = []
+    for text in _PAGE_BREAK.split(markdown):
+        lines = []
+        for line in text.splitlines():
+            line = _MARKUP.sub("", line).strip()
+            if line.startswith("#"):
+                line = "# " + line.lstrip("#").strip()
+            if line:
+                lines.append(line)
+        pages.append(lines)
+    return pages
+
+def _layout(pages: List[List[str]]) -> List[List[Tuple[float, str, bool]]]:
+    """
+    Positions lines on A4 pages. Each input page starts a new page and overflows onto
+    further pages when it doesn't fit.
+
+    Returns:
+        One list of (baseline y, text, is_heading) per rendered page.
+    """
+    layout = []
+    for lines in pages:
+        current: List[Tuple[float, str, bool]] = []
+        y = MARGIN
+        for line in lines:
+            heading = line.startswith("# ")
+            wrapped = [line[2:]] if heading else textwrap.wrap(line, WRAP_CHARS)
+            for text in wrapped:
+                if y + (36 if heading else LINE_HEIGHT) > PAGE_HEIGHT - MARGIN and current:
+                    layout.append(current)
+                    current, y = [], MARGIN
+                if heading:
+                    current.append((y + 16, text, True))
+                    y += 36
+                else:
+                    current.append((y, text, False))
+                    y += LINE_HEIGHT
+            if not heading:
+                y += LINE_HEIGHT // 2
+        layout.append(current)
+    return layout
+
+def count_pages(pages: List[List[str]]) -> int:
+    """Number of PDF pages `pages` would render to."""
+    return len(_layout(pages))
+
+def render_pdf(path: str, pages: List[List[str]]) -> int:
+    """
+    Renders pages of lines to `path` with PyMuPDF (no network, no LLM).
+    Headings use a larger bold font so the markdown converter detects them as headers.
+
+    Returns:
+        Number of pages written.
+    """
+    doc = pymupdf.open()
+    layout = _layout(pages)
+    for placed in layout:
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        for y, text, heading in placed:
+            if heading:
+                page.insert_text((MARGIN, y), text, fontsize=16, fontname="helvetica-bold")
+            else:
+                page.insert_text((MARGIN, y), text, fontsize=10, fontname="helvetica")
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+    return len(layout)
+
+def render_markdown_pdf(path: str, markdown: str) -> int:
+    """Renders a Markdown contract to a PDF at `path`; kept at module level for process pools."""
+    return render_pdf(path, markdown_pages(markdown))
+
+def write_contract_pdf(path: str, pages: int, clauses_per_page: int = 6, seed: int = 0) -> str:
+    """
+    Renders a synthetic multi-page contract to `path`.
+    
+    Returns:
+        path
+    """
+    render_pdf(path, contract_lines(pages, clauses_per_page, seed))
+    return path
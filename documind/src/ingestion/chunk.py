@@ -0,0 +1,70 @@
+import sys
+from typing import Any, Dict, Iterator, Tuple
+
+class Chunk:
+    """
+    One parsed block of a contract (a clause, or text under a heading).
+
+    A slotted object instead of a dict: no per-instance hash table, and section headings
+    and clause IDs are interned, so the many chunks sharing one heading share one string.
+    It still reads like the dicts it replaced (chunk["raw_text"], chunk.get("section")),
+    so code written against parser dicts, or against dicts loaded from older JSON files,
+    works with either.
+
+    page_no is the page the chunk starts on. A clause that runs over page breaks records
+    them in page_breaks as (offset in raw_text, page) pairs, so every line keeps its page.
+    """
+    __slots__ = ("page_no", "section", "clause_id", "raw_text", "page_breaks")
+
+    FIELDS: Tuple[str, ...] = ("page_no", "section", "clause_id", "raw_text", "page_breaks")
+
+    def __init__(self, page_no: int, section: str, clause_id: str, raw_text: str, page_breaks: Tuple[Tuple[int, int], ...] = ()):
+        self.page_no = page_no
+        self.section = sys.intern(section)
+        self.clause_id = sys.intern(clause_id)
+        self.raw_text = raw_text
+        self.page_breaks = page_breaks
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Chunk":
+        page_breaks = tuple(tuple(b) for b in data.get("page_breaks") or ())
+        return cls(data["page_no"], data.get("section", "General"), data["clause_id"], data["raw_text"], page_breaks)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"page_no": self.page_no, "section": self.section, "clause_id": self.clause_id, "raw_text": self.raw_text}
+        if self.page_breaks:
+            data["page_breaks"] = [list(b) for b in self.page_breaks]
+        return data
+
+    @property
+    def end_page(self) -> int:
+        return self.page_breaks[-1][1] if self.page_breaks else self.page_no
+
+    def page_at(self, offset: int) -> int:
+        """Page of the character at `offset` in raw_text."""
+        page = self.page_no
+        for start, break_page in self.page_breaks:
+            if offset < start:
+                break
+            page = break_page
+        return page
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.FIELDS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def __repr__(self) -> str:
+        return f"Chunk(page_no={self.page_no!r}, section={self.section!r}, clause_id={self.clause_id!r}, raw_text={self.raw_text[:40]!r})"
@@ -0,0 +1,61 @@
+import gzip
+import json
+import os
+from typing import List, Dict, Any, Optional
+from src.ingestion.chunk import Chunk
+from src.utils.paths import cache_dir
+
+class ChunkManifest:
+    """
+    Persists parser output so a contract is parsed once and reused across phases and runs.
+
+    Manifests are keyed by the PDF's content hash and the parser version, so an edited
+    file or a parser change never serves stale chunks. They are stored column-wise and
+    gzipped, with repeated section headings kept once.
+    """
+    def __init__(self, parser_version: str, directory: Optional[str] = None):
+        self.parser_version = parser_version
+        self.directory = directory or cache_dir("manifests")
+
+    def path_for(self, pdf_hash: str) -> str:
+        return os.path.join(self.directory, f"{pdf_hash}_v{self.parser_version}.json.gz")
+
+    def load(self, pdf_hash: str) -> Optional[List[Chunk]]:
+        """Returns the cached chunks for this PDF, or None if it hasn't been parsed yet."""
+        path = self.path_for(pdf_hash)
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable chunk manifest {path}: {e}")
+            return None
+        
+        sections = data["sections"]
+        columns = data["columns"]
+        # Sparse: only chunks spanning a page break have an entry, keyed by row
+        page_breaks = {int(row): tuple(tuple(b) for b in breaks) for row, breaks in columns.get("page_breaks", {}).items()}
+        return [
+            Chunk(page_no, sections[section], clause_id, raw_text, page_breaks.get(row, ()))
+            for row, (page_no, section, clause_id, raw_text) in enumerate(zip(
+                columns["page_no"], columns["section"], columns["clause_id"], columns["raw_text"]
+            ))
+        ]
+
+    def save(self, pdf_hash: str, chunks: List[Dict[str, Any]]):
+        section_ids: Dict[str, int] = {}
+        columns = {"page_no": [], "section": [], "clause_id": [], "raw_text": [], "page_breaks": {}}
+        for row, chunk in enumerate(chunks):
+            columns["page_no"].append(chunk["page_no"])
+            columns["section"].append(section_ids.setdefault(chunk["section"], len(section_ids)))
+            columns["clause_id"].append(chunk["clause_id"])
+            columns["raw_text"].append(chunk["raw_text"])
+            if chunk.get("page_breaks"):
+                columns["page_breaks"][row] = [list(b) for b in chunk["page_breaks"]]
+        
+        path = self.path_for(pdf_hash)
+        tmp_path = path + ".tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump({"sections": list(section_ids), "columns": columns}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
@@ -0,0 +1,55 @@
+import os
+import sqlite3
+import threading
+from array import array
+from typing import List, Optional
+from src.utils.hashing import text_hash
+from src.utils.paths import cache_dir
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed cache of embedding vectors.
+    Entries are keyed by a hash of the embedding model and the exact text, so a
+    re-ingest of an unchanged (or partially changed) contract only pays for new text.
+    """
+    # SQLite caps the number of bound parameters per statement
+    LOOKUP_BATCH = 500
+
+    def __init__(self, model: str, path: Optional[str] = None):
+        self.model = model
+        self.path = path or os.path.join(cache_dir(), "embeddings.sqlite")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+
+    def key(self, text: str) -> str:
+        return text_hash(self.model, text)
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Returns the cached vector for each text, or None on a miss."""
+        keys = [self.key(t) for t in texts]
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), self.LOOKUP_BATCH):
+                batch = keys[i:i + self.LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update(rows)
+        
+        return [self._decode(found[k]) if k in found else None for k in keys]
+
+    def put_many(self, texts: List[str], vectors: List[List[float]]):
+        rows = [(self.key(t), array("f", v).tobytes()) for t, v in zip(texts, vectors)]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+            self._conn.commit()
+
+    @staticmethod
+    def _decode(blob: bytes) -> List[float]:
+        vector = array("f")
+        vector.frombytes(blob)
+        return vector.tolist()
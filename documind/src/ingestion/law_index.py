@@ -0,0 +1,224 @@
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from typing import List, Dict, Any, Callable, Optional, Tuple
+import numpy as np
+from src.utils.hashing import text_hash
+from src.utils.paths import cache_dir
+
+# "Article 246", "Art. 12 bis", "ARTICLE (390)" at the start of a line
+_ARTICLE_PATTERN = re.compile(r"^\s*(?:#+\s*)?(?:article|art\.)\s*\(?(\d+[a-z]*(?:\s+bis)?)\)?", re.IGNORECASE | re.MULTILINE)
+_WORD_PATTERN = re.compile(r"\w+")
+_STOPWORDS = frozenset(
+    "a an and any are as at be by for from has have if in into is it its no not of on or shall "
+    "such that the their then there these this to was were which will with".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _WORD_PATTERN.findall(text.lower()) if t not in _STOPWORDS and len(t) > 1]
+
+def split_articles(text: str, source: str) -> List[Dict[str, str]]:
+    """
+    Splits one statute text file into articles on "Article N" headings.
+    A file without such headings becomes a single article named after the file.
+    """
+    matches = list(_ARTICLE_PATTERN.finditer(text))
+    if not matches:
+        return [{"article_id": source, "source": source, "text": text.strip()}] if text.strip() else []
+
+    articles = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[match.start():end].strip()
+        if body:
+            articles.append({"article_id": f"Article {match.group(1)}", "source": source, "text": body})
+    return articles
+
+class LawIndex:
+    """
+    Offline-built retrieval index over a local corpus of statute text files.
+
+    Each article is indexed twice: a BM25 inverted index for exact legal terms
+    ("liquidated damages", "force majeure") and a memory-mapped matrix of embeddings for
+    paraphrases. The two rankings are merged with reciprocal rank fusion. Clause query
+    vectors come from the local EmbeddingCache (filled when the contract was ingested),
+    so a lookup is pure local computation; results are memoized per clause text.
+    """
+    # BM25 parameters
+    K1 = 1.5
+    B = 0.75
+    # Reciprocal rank fusion constant and candidates taken from each ranking
+    RRF_K = 60
+    CANDIDATES = 50
+    MEMO_SIZE = 4096
+    # Articles are truncated to this many characters in the critic prompt
+    MAX_ARTICLE_CHARS = 1200
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "articles.json"), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.embedding_model: Optional[str] = data["embedding_model"]
+        self.articles: List[Dict[str, str]] = data["articles"]
+
+        with open(os.path.join(path, "bm25.json"), "r", encoding="utf-8") as f:
+            bm25 = json.load(f)
+        self._idf: Dict[str, float] = bm25["idf"]
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            term: (np.asarray(docs, dtype=np.int32), np.asarray(tfs, dtype=np.float32))
+            for term, (docs, tfs) in bm25["postings"].items()
+        }
+        doc_lengths = np.asarray(bm25["doc_lengths"], dtype=np.float32)
+        avg_length = float(doc_lengths.mean()) if len(doc_lengths) else 1.0
+        # Per-document part of the BM25 denominator, precomputed once
+        self._length_norm = self.K1 * (1 - self.B + self.B * doc_lengths / avg_length)
+
+        vectors_path = os.path.join(path, "vectors.npy")
+        self.vectors = np.load(vectors_path, mmap_mode="r") if os.path.exists(vectors_path) else None
+
+        self._memo: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def default_path() -> str:
+        return os.getenv("DOCUMIND_LAW_INDEX") or cache_dir("law_index")
+
+    @classmethod
+    def load_default(cls) -> Optional["LawIndex"]:
+        """Loads the index at the default location, or returns None if none has been built."""
+        path = cls.default_path()
+        if not os.path.exists(os.path.join(path, "articles.json")):
+            return None
+        return cls(path)
+
+    @classmethod
+    def build(cls, corpus_dir: str, path: str, embed_documents: Optional[Callable[[List[str]], List[List[float]]]] = None,
+              embedding_model: Optional[str] = None) -> "LawIndex":
+        """
+        Builds the index from every .txt file under `corpus_dir` and writes it to `path`.
+
+        Args:
+            embed_documents: Embeds article texts for the dense half; without it the index is BM25-only.
+            embedding_model: Name of the model behind `embed_documents`, checked at query time.
+        """
+        articles = []
+        for file_path in sorted(glob.glob(os.path.join(corpus_dir, "**", "*.txt"), recursive=True)):
+            with open(file_path, "r", encoding="utf-8") as f:
+                source = os.path.splitext(os.path.relpath(file_path, corpus_dir))[0]
+                articles.extend(split_articles(f.read(), source))
+
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        doc_lengths = []
+        for doc, article in enumerate(articles):
+            terms = Counter(tokenize(article["text"]))
+            doc_lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                docs, tfs = postings.setdefault(term, ([], []))
+                docs.append(doc)
+                tfs.append(tf)
+        n = len(articles)
+        idf = {term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5)) for term, (docs, _) in postings.items()}
+
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "bm25.json"), "w", encoding="utf-8") as f:
+            json.dump({"idf": idf, "postings": postings, "doc_lengths": doc_lengths}, f)
+
+        vectors_path = os.path.join(path, "vectors.npy")
+        if embed_documents and articles:
+            vectors = np.asarray(embed_documents([a["text"] for a in articles]), dtype=np.float32)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            np.save(vectors_path, vectors / norms)
+        elif os.path.exists(vectors_path):
+            os.remove(vectors_path)
+
+        with open(os.path.join(path, "articles.json"), "w", encoding="utf-8") as f:
+            json.dump({"embedding_model": embedding_model if embed_documents else None, "articles": articles}, f, ensure_ascii=False)
+        return cls(path)
+
+    def _bm25_ranking(self, text: str) -> List[int]:
+        scores = np.zeros(len(self.articles), dtype=np.float32)
+        for term in set(tokenize(text)):
+            if term not in self._postings:
+                continue
+            docs, tfs = self._postings[term]
+            scores[docs] += self._idf[term] * tfs * (self.K1 + 1) / (tfs + self._length_norm[docs])
+        hits = np.flatnonzero(scores)
+        k = min(self.CANDIDATES, len(hits))
+        if k == 0:
+            return []
+        top = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        return top[np.argsort(-scores[top])].tolist()
+
+    def _dense_ranking(self, vector: Optional[List[float]]) -> List[int]:
+        if self.vectors is None or vector is None:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        scores = self.vectors @ query
+        k = min(self.CANDIDATES, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top])].tolist()
+
+    def search(self, text: str, top_k: int = 3, vector: Optional[List[float]] = None) -> List[Dict[str, Any]]:
+        """
+        Returns the `top_k` most relevant articles for a clause, fusing BM25 and dense rankings.
+        Without a query vector (or a dense matrix), ranks by BM25 alone.
+        """
+        if not self.articles:
+            return []
+        memo_key = text_hash(text, str(top_k), "dense" if vector is not None else "sparse")
+        with self._lock:
+            if memo_key in self._memo:
+                self._memo.move_to_end(memo_key)
+                return self._memo[memo_key]
+
+        fused: Dict[int, float] = {}
+        for ranking in (self._bm25_ranking(text), self._dense_ranking(vector)):
+            for rank, doc in enumerate(ranking):
+                fused[doc] = fused.get(doc, 0.0) + 1.0 / (self.RRF_K + rank + 1)
+        best = sorted(fused, key=fused.get, reverse=True)[:top_k]
+        results = [{**self.articles[doc], "score": fused[doc]} for doc in best]
+
+        with self._lock:
+            self._memo[memo_key] = results
+            if len(self._memo) > self.MEMO_SIZE:
+                self._memo.popitem(last=False)
+        return results
+
+    def format_articles(self, articles: List[Dict[str, Any]]) -> str:
+        """Renders retrieved articles as the `relevant_laws` text of the critic prompt."""
+        parts = []
+        for article in articles:
+            body = article["text"]
+            if len(body) > self.MAX_ARTICLE_CHARS:
+                body = body[:self.MAX_ARTICLE_CHARS].rstrip() + " ..."
+            parts.append(f"[{article['source']}, {article['article_id']}]\n{body}")
+        return "\n\n".join(parts)
+
+def main():
+    parser = argparse.ArgumentParser(description="DocuMind: Build the local law-corpus index")
+    parser.add_argument("corpus_dir", help="Directory of statute .txt files")
+    parser.add_argument("--output", default=None, help="Index directory (defaults to DOCUMIND_LAW_INDEX or the local cache)")
+    parser.add_argument("--sparse-only", action="store_true", help="Skip embeddings and build a BM25-only index")
+    args = parser.parse_args()
+
+    embed_documents, embedding_model = None, None
+    if not args.sparse_only:
+        from dotenv import load_dotenv
+        from src.ingestion.vector_store import VectorStoreManager
+        load_dotenv()
+        # Same model and embedding cache as contract ingestion, so clause vectors are comparable
+        vs_manager = VectorStoreManager(backend="local")
+        embed_documents, embedding_model = vs_manager._embed_documents, vs_manager.embedding_model
+
+    index = LawIndex.build(args.corpus_dir, args.output or LawIndex.default_path(), embed_documents, embedding_model)
+    print(f"Indexed {len(index.articles)} articles into {index.path}")
+
+if __name__ == "__main__":
+    main()
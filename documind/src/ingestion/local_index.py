@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+from typing import List, Dict, Any, Iterator, Optional
+import numpy as np
+
+class _Namespace:
+    """In-memory view of one namespace: a memory-mapped vector matrix plus row bookkeeping."""
+    def __init__(self, path: str, dimension: int, dtype: np.dtype):
+        self.path = path
+        self.matrix_path = os.path.join(path, "vectors.npy")
+        self.meta_path = os.path.join(path, "meta.json")
+        os.makedirs(path, exist_ok=True)
+
+        self.ids: List[str] = []
+        self.metadata: List[Dict[str, Any]] = []
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.ids = meta["ids"]
+            self.metadata = meta["metadata"]
+        self.rows = {vid: i for i, vid in enumerate(self.ids)}
+
+        if os.path.exists(self.matrix_path):
+            self.matrix = np.lib.format.open_memmap(self.matrix_path, mode="r+")
+        else:
+            self.matrix = np.lib.format.open_memmap(self.matrix_path, mode="w+", dtype=dtype, shape=(64, dimension))
+
+    @property
+    def count(self) -> int:
+        return len(self.ids)
+
+    def reserve(self, rows: int):
+        """Grows the backing file (doubling) so at least `rows` vectors fit."""
+        capacity = self.matrix.shape[0]
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+
+        tmp_path = self.matrix_path + ".tmp"
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=self.matrix.dtype, shape=(capacity, self.matrix.shape[1]))
+        grown[:self.count] = self.matrix[:self.count]
+        grown.flush()
+        del grown
+        self.matrix = None
+        os.replace(tmp_path, self.matrix_path)
+        self.matrix = np.lib.format.open_memmap(self.matrix_path, mode="r+")
+
+    def save(self):
+        self.matrix.flush()
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"ids": self.ids, "metadata": self.metadata}, f)
+        os.replace(tmp_path, self.meta_path)
+
+
+class LocalVectorIndex:
+    """
+    In-process vector index backed by one memory-mapped matrix per namespace.
+    Mirrors the subset of the Pinecone `Index` API that VectorStoreManager uses
+    (upsert, query, list, delete), so it can be swapped in without touching callers.
+
+    Vectors are stored L2-normalized, which makes cosine similarity a single matrix-vector
+    product; a contract's few thousand chunks are searched in microseconds.
+    """
+    def __init__(self, path: str, dimension: int, dtype: str = "float32"):
+        self.path = path
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock = threading.Lock()
+
+    def _namespace(self, namespace: str) -> _Namespace:
+        if namespace not in self._namespaces:
+            self._namespaces[namespace] = _Namespace(os.path.join(self.path, namespace), self.dimension, self.dtype)
+        return self._namespaces[namespace]
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str = "default"):
+        """Inserts or overwrites vectors given as {"id", "values", "metadata"} dicts."""
+        if not vectors:
+            return
+        values = self._normalize(np.asarray([v["values"] for v in vectors], dtype=np.float32))
+
+        with self._lock:
+            ns = self._namespace(namespace)
+            ns.reserve(ns.count + len(vectors))
+            for v, row_values in zip(vectors, values):
+                row = ns.rows.get(v["id"])
+                if row is None:
+                    row = ns.count
+                    ns.rows[v["id"]] = row
+                    ns.ids.append(v["id"])
+                    ns.metadata.append(v.get("metadata", {}))
+                else:
+                    ns.metadata[row] = v.get("metadata", {})
+                ns.matrix[row] = row_values
+            ns.save()
+
+    def query(self, vector: List[float], top_k: int = 5, namespace: str = "default", include_metadata: bool = True) -> Dict[str, Any]:
+        """Cosine top-k for a single query vector. Returns {"matches": [...]} like Pinecone."""
+        return {"matches": self.query_batch([vector], top_k, namespace, include_metadata)[0]}
+
+    def query_batch(self, vectors: List[List[float]], top_k: int = 5, namespace: str = "default", include_metadata: bool = True) -> List[List[Dict[str, Any]]]:
+        """Cosine top-k for many query vectors in one matrix product."""
+        queries = self._normalize(np.asarray(vectors, dtype=np.float32))
+
+        with self._lock:
+            ns = self._namespace(namespace)
+            count = ns.count
+            if count == 0:
+                return [[] for _ in vectors]
+            scores = queries @ ns.matrix[:count].astype(np.float32, copy=False).T
+            ids, metadata = ns.ids[:count], ns.metadata[:count]
+
+        k = min(top_k, count)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for q, candidates in enumerate(top):
+            ordered = candidates[np.argsort(-scores[q, candidates])]
+            results.append([
+                {
+                    "id": ids[row],
+                    "score": float(scores[q, row]),
+                    **({"metadata": metadata[row]} if include_metadata else {})
+                }
+                for row in ordered
+            ])
+        return results
+
+    def list(self, prefix: Optional[str] = None, namespace: str = "default", page_size: int = 100) -> Iterator[List[str]]:
+        """Yields pages of vector IDs, optionally filtered by prefix."""
+        with self._lock:
+            ids = [vid for vid in self._namespace(namespace).ids if not prefix or vid.startswith(prefix)]
+        for i in range(0, len(ids), page_size):
+            yield ids[i:i + page_size]
+
+    def delete(self, ids: List[str], namespace: str = "default"):
+        """Removes vectors by ID, keeping rows compact by moving the last row into each hole."""
+        with self._lock:
+            ns = self._namespace(namespace)
+            for vid in ids:
+                row = ns.rows.pop(vid, None)
+                if row is None:
+                    continue
+                last = ns.count - 1
+                if row != last:
+                    ns.matrix[row] = ns.matrix[last]
+                    ns.ids[row] = ns.ids[last]
+                    ns.metadata[row] = ns.metadata[last]
+                    ns.rows[ns.ids[row]] = row
+                ns.ids.pop()
+                ns.metadata.pop()
+            ns.save()
@@ -1,111 +1,276 @@
-from typing import List, Dict, Optional
-import pymupdf4llm
+from typing import List, Dict, Iterator, Optional, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 import re
+import time
+from src.ingestion.chunk import Chunk
+from src.utils.rate_limiter import estimate_tokens
+from src.utils.telemetry import telemetry
+
+def _render_page_range(file_path: str, pages: List[int], hdr_info=None) -> List[Tuple[int, str]]:
+    """
+    Worker entry point for windowed/parallel parsing. Converts a range of pages to markdown.
+    Kept at module level so it can be pickled into a process pool.
+    
+    Returns:
+        List of (page_num, markdown_text) tuples, in page order.
+    """
+    import pymupdf4llm
+    md_chunks = pymupdf4llm.to_markdown(file_path, pages=pages, page_chunks=True, hdr_info=hdr_info)
+    # Only ship what the splitter needs back across the process boundary
+    return [(_page_number(chunk['metadata']), chunk['text']) for chunk in md_chunks]
+
+def _page_number(metadata: Dict) -> int:
+    """1-indexed page number of a pymupdf4llm page chunk."""
+    # Current releases report a 1-indexed `page_number`; older ones a 0-indexed `page`
+    page_number = metadata.get('page_number')
+    return page_number if page_number is not None else metadata['page'] + 1
 
 class PDFProcessor:
     """
     Handles the ingestion of PDF documents, converting them to structured text
     with metadata suitable for vector database indexing.
+    
+    Markdown files (e.g. the synthetic golden dataset) are read directly and go through the
+    same clause splitting, skipping PDF rendering entirely.
     """
-    def __init__(self):
+    # Bump whenever chunking output changes; cached chunk manifests are keyed on it
+    PARSER_VERSION = "3"
+    
+    # Sub-clauses are packed into their parent clause up to this many (estimated) tokens
+    PACK_TOKENS = 400
+    
+    MARKDOWN_EXTENSIONS = (".md", ".markdown")
+    # Page breaks in Markdown input: form feeds, or the "-----" rule pymupdf4llm puts between pages
+    PAGE_BREAK_PATTERN = re.compile(r'\f|^-----\s*$', re.MULTILINE)
+
+    def __init__(self, pack_tokens: Optional[int] = None):
+        """
+        Args:
+            pack_tokens: Token budget for packing sub-clauses into their parent (0 disables packing).
+        """
+        self.pack_tokens = self.PACK_TOKENS if pack_tokens is None else pack_tokens
         # Regex for detecting common legal clause patterns
         # Matches: "1.", "1.1", "Article 1", "SECTION 2", "(a)", etc.
         self.clause_pattern = re.compile(r'^(?:Article\s+\d+|Section\s+\d+|Clause\s+\d+|\d+\.\d+|\(\w\))', re.IGNORECASE)
         self.header_pattern = re.compile(r'^#+\s+(.*)')
 
-    def parse_pdf(self, file_path: str) -> List[Dict]:
+    def parse_pdf(self, file_path: str, workers: int = 1, pages_per_task: int = 8) -> List[Chunk]:
         """
-        Parses a PDF file and returns a list of chunks with metadata.
+        Parses a PDF (or Markdown) file and returns a list of chunks with metadata.
         
         Args:
-            file_path: Path to the PDF file.
+            file_path: Path to the PDF or Markdown file.
+            workers: Number of processes used for markdown conversion. 1 keeps the
+                     single-process path.
+            pages_per_task: Number of pages converted per worker task in parallel mode.
             
         Returns:
-            List of dicts: { "page_no": int, "section": str, "clause_id": str, "raw_text": str }
+            List of Chunks (page_no, section, clause_id, raw_text), readable like dicts.
+            
+        Raises:
+            RuntimeError: If the document cannot be read or converted.
         """
         try:
-            # Get markdown chunks with page metadata
-            md_chunks = pymupdf4llm.to_markdown(file_path, page_chunks=True)
+            return [
+                chunk
+                for window in self.iter_chunks(file_path, window_size=pages_per_task, workers=workers)
+                for chunk in window
+            ]
         except Exception as e:
-            print(f"Error reading PDF {file_path}: {e}")
-            return []
-        
-        processed_chunks = []
+            raise RuntimeError(f"Error reading PDF {file_path}: {e}") from e
+
+    def iter_chunks(self, file_path: str, window_size: int = 8, workers: int = 1) -> Iterator[List[Chunk]]:
+        """
+        Streams chunks one page window at a time, so callers can index a document
+        without holding all of it in memory.
         
-        for chunk in md_chunks:
-            page_num = chunk['metadata']['page'] + 1 # 1-indexed for human readability
-            text = chunk['text']
-            
-            # Split page content into semantic blocks (clauses/sections)
-            page_clauses = self._split_into_clauses(text, page_num)
-            processed_chunks.extend(page_clauses)
+        Args:
+            file_path: Path to the PDF or Markdown file.
+            window_size: Number of pages converted per window.
+            workers: Number of processes used for markdown conversion.
             
-        return processed_chunks
+        Yields:
+            List of Chunks completed in each window, in page order (may be empty), then
+            a final list with the document's last clause.
+        """
+        splitter = _ClauseSplitter(self, self.pack_tokens)
+        
+        # Splitting is cheap and order-dependent, so it always runs here, in page order.
+        # The open section and clause carry over page (and therefore window) boundaries, so a
+        # window yields the clauses completed in it and the last one follows with the next window.
+        # Each window's latency covers waiting for its markdown plus splitting, not the consumer's work
+        start = time.perf_counter()
+        for pages in self._iter_page_windows(file_path, window_size, workers):
+            window_chunks = []
+            for page_num, text in pages:
+                # Split page content into semantic blocks (clauses/sections)
+                window_chunks.extend(splitter.feed(page_num, text))
+            telemetry.observe("parse_window", time.perf_counter() - start, start)
+            yield window_chunks
+            start = time.perf_counter()
+        yield splitter.finish()
 
-    def _split_into_clauses(self, text: str, page_num: int) -> List[Dict]:
+    def _iter_page_windows(self, file_path: str, window_size: int, workers: int) -> Iterator[List[Tuple[int, str]]]:
         """
-        Parses markdown text to split by clauses/sections while maintaining context.
+        Converts the document to markdown in contiguous page windows, optionally across
+        a process pool. Windows are yielded in page order regardless of which worker finishes first.
         """
-        chunks = []
-        lines = text.split('\n')
+        if file_path.lower().endswith(self.MARKDOWN_EXTENSIONS):
+            yield from self._iter_markdown_windows(file_path, window_size)
+            return
         
-        current_clause_id = "General"
-        current_section = "General"
-        buffer_text = []
+        # Imported on first use: loading PyMuPDF and its markdown converter takes most of a second
+        import pymupdf
+        import pymupdf4llm
         
-        for line in lines:
+        with pymupdf.open(file_path) as doc:
+            page_count = doc.page_count
+        
+        # Header levels are derived from font sizes across the whole document, so compute
+        # them once up front; per-window detection would classify headers differently.
+        # (Not needed, and not exposed, when pymupdf4llm runs in layout mode.)
+        identify_headers = getattr(pymupdf4llm, "IdentifyHeaders", None)
+        hdr_info = identify_headers(file_path) if identify_headers else None
+        
+        page_ranges = [
+            list(range(start, min(start + window_size, page_count)))
+            for start in range(0, page_count, window_size)
+        ]
+        
+        if workers <= 1:
+            for pages in page_ranges:
+                yield _render_page_range(file_path, pages, hdr_info)
+            return
+        
+        # Bound the work in flight so a slow consumer (e.g. embedding) applies backpressure
+        # to the pool instead of letting rendered pages pile up in memory.
+        max_in_flight = workers * 2
+        remaining = iter(page_ranges)
+        with ProcessPoolExecutor(max_workers=min(workers, len(page_ranges)) or 1) as executor:
+            pending = deque(
+                executor.submit(_render_page_range, file_path, pages, hdr_info)
+                for pages in islice(remaining, max_in_flight)
+            )
+            while pending:
+                rendered = pending.popleft().result()
+                next_pages = next(remaining, None)
+                if next_pages is not None:
+                    pending.append(executor.submit(_render_page_range, file_path, next_pages, hdr_info))
+                yield rendered
+
+    def _iter_markdown_windows(self, file_path: str, window_size: int) -> Iterator[List[Tuple[int, str]]]:
+        """Reads a Markdown file as pages (split on page breaks, if any) in windows of `window_size` pages."""
+        with open(file_path, "r", encoding="utf-8") as f:
+            pages = [(i + 1, text) for i, text in enumerate(self.PAGE_BREAK_PATTERN.split(f.read()))]
+        for start in range(0, len(pages), window_size):
+            yield pages[start:start + window_size]
+
+    def _is_subclause(self, clause_id: str) -> bool:
+        return clause_id.startswith("(")
+
+    def _add_chunk(self, chunks_list: List[Chunk], section: str, clause: str, lines: List[Tuple[int, str]]):
+        """Helper to append a chunk from (page, line) pairs, recording where it crosses pages."""
+        content = "\n".join(text for _, text in lines)
+        if len(content.strip()) < 10: # Skip noise/tiny chunks
+            return
+        
+        page_breaks = []
+        offset = 0
+        for i, (page, text) in enumerate(lines):
+            if i and page != lines[i - 1][0]:
+                page_breaks.append((offset, page))
+            offset += len(text) + 1
+        chunks_list.append(Chunk(lines[0][0], section, clause, content, tuple(page_breaks)))
+
+class _ClauseSplitter:
+    """
+    Document-level clause splitter, fed one page at a time.
+    
+    A clause stays open across page (and window) boundaries until the next heading or
+    clause delimiter, so a clause running over a page break comes out as one chunk rather
+    than a fragment plus an unlabelled continuation. Sub-clauses ("(a)", "(b)") are packed
+    into their parent clause while the combined text fits in `pack_tokens`.
+    """
+    def __init__(self, processor: PDFProcessor, pack_tokens: int):
+        self.processor = processor
+        self.pack_tokens = pack_tokens
+        self.section = "General"
+        self.clause_id = "General"
+        # The open clause: a parent segment plus any sub-clause segments, each (clause_id, [(page, line), ...])
+        self.group: List[Tuple[str, List[Tuple[int, str]]]] = []
+
+    def feed(self, page_num: int, text: str) -> List[Chunk]:
+        """
+        Splits one page of markdown.
+        
+        Returns:
+            Chunks completed on this page; the clause still open at the end of the page is kept.
+        """
+        chunks = []
+        for line in text.split('\n'):
             line = line.strip()
             if not line:
                 continue
-                
-            # 1. Check for Headers (Section detection)
-            header_match = self.header_pattern.match(line)
+            
+            # 1. Headers close the open clause and start a new section; text under the
+            #    heading has no clause ID until the next clause delimiter
+            header_match = self.processor.header_pattern.match(line)
             if header_match:
-                # If we hit a new header, flush previous buffer
-                if buffer_text:
-                    self._add_chunk(chunks, page_num, current_section, current_clause_id, buffer_text)
-                    buffer_text = []
-                
-                current_section = header_match.group(1)
-                # Reset clause ID on new major section? Depends on document. Keeping it safe.
-                # buffer_text.append(line) # Keep header in text? Yes.
+                self._flush(chunks)
+                self.section = header_match.group(1)
+                self.clause_id = "General"
             
-            # 2. Check for Clause delimiters
-            clause_match = self.clause_pattern.match(line)
+            # 2. Clause delimiters close it too, unless a sub-clause can join its parent
+            clause_match = self.processor.clause_pattern.match(line)
             if clause_match:
-                 # If we hit a new clause, flush previous buffer
-                if buffer_text:
-                    self._add_chunk(chunks, page_num, current_section, current_clause_id, buffer_text)
-                    buffer_text = []
-                
-                current_clause_id = clause_match.group(0)
-            
-            buffer_text.append(line)
-            
-        # Flush remaining buffer
-        if buffer_text:
-            self._add_chunk(chunks, page_num, current_section, current_clause_id, buffer_text)
+                clause_id = clause_match.group(0)
+                if self._packable(clause_id):
+                    # The running ID stays the parent's: the sub-clause is part of its chunk
+                    self.group.append((clause_id, []))
+                else:
+                    self._flush(chunks)
+                    self.clause_id = clause_id
             
+            if not self.group:
+                self.group.append((self.clause_id, []))
+            self.group[-1][1].append((page_num, line))
         return chunks
 
-    def _add_chunk(self, chunks_list: List[Dict], page: int, section: str, clause: str, text_lines: List[str]):
-        """Helper to append a chunk."""
-        content = "\n".join(text_lines)
-        if len(content.strip()) < 10: # Skip noise/tiny chunks
+    def finish(self) -> List[Chunk]:
+        """Closes the last clause of the document."""
+        chunks = []
+        self._flush(chunks)
+        return chunks
+
+    def _packable(self, clause_id: str) -> bool:
+        if not self.pack_tokens or not self.group or not self.processor._is_subclause(clause_id):
+            return False
+        parent = self.group[0][0]
+        return parent != "General" and not self.processor._is_subclause(parent)
+
+    def _flush(self, chunks: List[Chunk]):
+        """Emits the open clause, packing sub-clauses into the parent until the token budget is reached."""
+        if not self.group:
             return
-            
-        chunks_list.append({
-            "page_no": page,
-            "section": section,
-            "clause_id": clause,
-            "raw_text": content
-        })
+        packed_id, packed = self.group[0][0], list(self.group[0][1])
+        tokens = sum(estimate_tokens(text) for _, text in packed)
+        for clause_id, lines in self.group[1:]:
+            size = sum(estimate_tokens(text) for _, text in lines)
+            if tokens + size > self.pack_tokens:
+                self.processor._add_chunk(chunks, self.section, packed_id, packed)
+                packed_id, packed, tokens = clause_id, [], 0
+            packed.extend(lines)
+            tokens += size
+        self.processor._add_chunk(chunks, self.section, packed_id, packed)
+        self.group = []
 
 if __name__ == "__main__":
     # Smoke test
     import sys
     if len(sys.argv) > 1:
         processor = PDFProcessor()
-        results = processor.parse_pdf(sys.argv[1])
+        results = processor.parse_pdf(sys.argv[1], workers=int(sys.argv[2]) if len(sys.argv) > 2 else 1)
         for r in results[:3]:
             print(r)
@@ -0,0 +1,204 @@
+import json
+import os
+import re
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+from src.ingestion.chunk import Chunk
+from src.utils.paths import cache_dir
+
+# Typographic variants the LLM tends to "fix" when quoting, and markdown noise from the parser
+_CHAR_MAP = {"‘": "'", "’": "'", "“": '"', "”": '"', "–": "-", "—": "-", " ": " "}
+_STRIP_CHARS = set("*_#`>|")
+_WORD_PATTERN = re.compile(r"\w+")
+
+def _normalize(text: str) -> Tuple[str, array]:
+    """
+    Lowercases, unifies quotes/dashes, drops markdown markup and collapses whitespace.
+
+    Returns:
+        (normalized_text, raw_map) where raw_map[i] is the offset in `text` of normalized char i.
+    """
+    out = []
+    raw_map = array("I")
+    pending_space = False
+    for i, ch in enumerate(text):
+        ch = _CHAR_MAP.get(ch, ch)
+        if ch in _STRIP_CHARS:
+            continue
+        if ch.isspace():
+            pending_space = bool(out)
+            continue
+        if pending_space:
+            out.append(" ")
+            raw_map.append(i)
+            pending_space = False
+        for c in ch.lower():
+            out.append(c)
+            raw_map.append(i)
+    return "".join(out), raw_map
+
+class QuoteIndex:
+    """
+    Per-contract text index used to verify that a quoted passage really occurs in the contract.
+
+    Exact containment is a substring search over one normalized buffer of all chunk text.
+    Near-exact quotes (a dropped word, re-flowed punctuation) are matched through an
+    inverted index of word shingles. Both run locally in well under a millisecond per quote.
+
+    The saved index is also the contract's local text store: vectors carry only offsets,
+    and VectorStoreManager resolves matches to text from these chunks.
+    """
+    SHINGLE_SIZE = 3
+    # Candidate chunks re-scored exactly after shingle voting
+    CANDIDATES = 3
+    # Separates chunks in the search buffer so a match can never straddle two chunks
+    SEPARATOR = "\x00"
+
+    def __init__(self):
+        self.chunks: List[Chunk] = []
+        self._normalized: List[str] = []
+        self._raw_maps: List[array] = []
+        self._shingles: Dict[str, List[int]] = {}
+        self._buffer: Optional[str] = None
+        self._starts: List[int] = []
+
+    @staticmethod
+    def path_for(namespace: str) -> str:
+        return os.path.join(cache_dir("quote_index"), f"{namespace}.json")
+
+    def add_chunks(self, chunks: List[Dict[str, Any]]):
+        """Indexes chunks as produced by PDFProcessor."""
+        for chunk in chunks:
+            idx = len(self.chunks)
+            chunk = chunk if isinstance(chunk, Chunk) else Chunk.from_dict(chunk)
+            self.chunks.append(chunk)
+            normalized, raw_map = _normalize(chunk["raw_text"])
+            self._normalized.append(normalized)
+            self._raw_maps.append(raw_map)
+            for shingle in set(self._shingle_words(_WORD_PATTERN.findall(normalized))):
+                self._shingles.setdefault(shingle, []).append(idx)
+        # Rebuilt lazily on the next lookup
+        self._buffer = None
+
+    def _shingle_words(self, words: List[str]) -> List[str]:
+        k = min(self.SHINGLE_SIZE, len(words))
+        return [" ".join(words[i:i + k]) for i in range(len(words) - k + 1)] if k else []
+
+    def _ensure_buffer(self):
+        if self._buffer is not None:
+            return
+        self._starts = []
+        pos = 0
+        for normalized in self._normalized:
+            self._starts.append(pos)
+            pos += len(normalized) + len(self.SEPARATOR)
+        self._buffer = self.SEPARATOR.join(self._normalized)
+
+    def find(self, quote: str) -> Optional[Dict[str, Any]]:
+        """
+        Locates a quote in the indexed contract.
+
+        Returns:
+            None if nothing overlaps, else the best match:
+            { "exact": bool, "score": float, "chunk_index": int, "page_no": int,
+              "clause_id": str, "start": int, "end": int }
+            where start/end is the character span in the chunk's raw_text, page_no is the
+            page the match starts on, and score is the fraction of the quote's shingles
+            found in the chunk (1.0 for exact matches).
+        """
+        normalized_quote, _ = _normalize(quote)
+        if not normalized_quote:
+            return None
+
+        # 1. Exact containment
+        self._ensure_buffer()
+        pos = self._buffer.find(normalized_quote)
+        if pos >= 0:
+            idx = bisect_right(self._starts, pos) - 1
+            local = pos - self._starts[idx]
+            raw_map = self._raw_maps[idx]
+            return self._match(idx, True, 1.0, raw_map[local], raw_map[local + len(normalized_quote) - 1] + 1)
+
+        # 2. Near-exact: shingles are built from word tokens only, so punctuation and
+        # quote-mark differences don't matter. Boilerplate shingles ("the employee shall")
+        # hit most chunks, so candidates are voted on by the rarest half of the quote.
+        quote_shingles = set(self._shingle_words(_WORD_PATTERN.findall(normalized_quote)))
+        postings = sorted((self._shingles.get(s, ()) for s in quote_shingles), key=len)
+        votes = Counter()
+        for posting in postings[:max(1, (len(postings) + 1) // 2)]:
+            votes.update(posting)
+        if not votes:
+            return None
+
+        best = None
+        for idx, _ in votes.most_common(self.CANDIDATES):
+            hits, start, end = self._score_chunk(idx, quote_shingles)
+            if hits and (best is None or hits > best[1]):
+                best = (idx, hits, start, end)
+        if best is None:
+            return None
+
+        idx, hits, start, end = best
+        return self._match(idx, False, hits / len(quote_shingles), start, end)
+
+    def _score_chunk(self, idx: int, quote_shingles: set) -> Tuple[int, int, int]:
+        """
+        Counts quote shingles present in a chunk.
+
+        Returns:
+            (hits, start, end) with the raw character span covering the matched shingles.
+        """
+        normalized = self._normalized[idx]
+        words = [(m.start(), m.end(), m.group()) for m in _WORD_PATTERN.finditer(normalized)]
+        k = min(self.SHINGLE_SIZE, len(words))
+        found = set()
+        start, end = None, None
+        for i in range(len(words) - k + 1):
+            shingle = " ".join(w for _, _, w in words[i:i + k])
+            if shingle in quote_shingles:
+                found.add(shingle)
+                start = words[i][0] if start is None else start
+                end = words[i + k - 1][1]
+        if not found:
+            return 0, 0, 0
+        raw_map = self._raw_maps[idx]
+        return len(found), raw_map[start], raw_map[end - 1] + 1
+
+    def _match(self, idx: int, exact: bool, score: float, start: int, end: int) -> Dict[str, Any]:
+        chunk = self.chunks[idx]
+        return {
+            "exact": exact,
+            "score": score,
+            "chunk_index": idx,
+            "page_no": chunk.page_at(start),
+            "clause_id": chunk["clause_id"],
+            "start": start,
+            "end": end
+        }
+
+    def save(self, path: str):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"chunks": [c.to_dict() for c in self.chunks]}, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load_chunks(path: str) -> Optional[List[Chunk]]:
+        """The saved chunks alone, without building the search structures."""
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return [Chunk.from_dict(c) for c in data["chunks"]]
+
+    @classmethod
+    def load(cls, path: str) -> Optional["QuoteIndex"]:
+        """Loads an index saved at ingest time, or None if the contract was never indexed."""
+        chunks = cls.load_chunks(path)
+        if chunks is None:
+            return None
+        index = cls()
+        index.add_chunks(chunks)
+        return index
@@ -1,31 +1,127 @@
+import copy
+import json
 import os
+import re
 import time
-from typing import List, Dict, Any
-from pinecone import Pinecone, ServerlessSpec
-from langchain_openai import OpenAIEmbeddings
+import queue
+import threading
+from typing import List, Dict, Any, Iterable, Optional, Set, TYPE_CHECKING
 from tqdm import tqdm
+from src.ingestion.embedding_cache import EmbeddingCache
+from src.ingestion.quote_index import QuoteIndex
+from src.utils.hashing import text_hash
+from src.utils.llm_provider import get_provider
+from src.utils.paths import cache_dir
+from src.utils.rate_limiter import estimate_tokens
+from src.utils.telemetry import telemetry
+
+if TYPE_CHECKING:
+    from langchain_core.embeddings import Embeddings
 
 class VectorStoreManager:
     """
-    Manages interactions with Pinecone Vector Database.
+    Manages interactions with the vector database.
     Handles index creation, deletion, and document upsertion.
+    
+    Vector metadata holds only the clause ID and the chunk's position in its document;
+    query matches get their text from the contract's local QuoteIndex, so contract text
+    is not stored in (or sent back from) the vector database.
+    
+    The backend is Pinecone by default. backend="local" (or DOCUMIND_VECTOR_BACKEND=local)
+    swaps in an in-process, memory-mapped LocalVectorIndex with the same interface,
+    so the pipeline runs without Pinecone at all.
     """
-    def __init__(self, index_name: str = "documind-index", namespace: str = "default"):
+    # Pinecone's delete() accepts at most 1000 IDs per call
+    DELETE_BATCH = 1000
+    # How long a verified index (exists, ready, host) is trusted before Pinecone is asked again
+    INDEX_METADATA_TTL = float(os.getenv("DOCUMIND_INDEX_METADATA_TTL", "600"))
+
+    def __init__(self, index_name: str = "documind-index", namespace: str = "default", use_embedding_cache: bool = True, backend: Optional[str] = None, embeddings: Optional["Embeddings"] = None):
+        self.backend = backend or os.getenv("DOCUMIND_VECTOR_BACKEND", "pinecone")
+        self.index_name = index_name
+        self.namespace = namespace
+        if embeddings is None:
+            self.embedding_model = "text-embedding-3-small" # Efficient for legal text
+            self.embeddings = get_provider().embeddings(self.embedding_model)
+        else:
+            # Substitute model (e.g. the benchmark's stand-in); its name keeps cached vectors separate
+            self.embedding_model = getattr(embeddings, "model", type(embeddings).__name__)
+            self.embeddings = embeddings
+        self.embedding_cache = EmbeddingCache(self.embedding_model) if use_embedding_cache else None
+        self.dimension = 1536 # OpenAI embedding dimension
+        # namespace -> (QuoteIndex mtime, chunks, vector_id -> chunk), for resolving matches to text
+        self._local_chunks: Dict[str, Any] = {}
+
+        if self.backend == "local":
+            from src.ingestion.local_index import LocalVectorIndex
+            self.index = LocalVectorIndex(
+                path=cache_dir("vectors", self.index_name),
+                dimension=self.dimension,
+                dtype=os.getenv("DOCUMIND_LOCAL_VECTOR_DTYPE", "float32")
+            )
+        elif self.backend == "pinecone":
+            self._init_pinecone()
+        else:
+            raise ValueError(f"Unknown vector backend: {self.backend}")
+
+    def for_namespace(self, namespace: str) -> "VectorStoreManager":
+        """
+        A manager for another namespace that shares this one's clients, index handle and caches,
+        so per-contract managers skip client setup and index checks.
+        """
+        manager = copy.copy(self)
+        manager.namespace = namespace
+        return manager
+
+    def _init_pinecone(self):
+        """Connects to Pinecone (imported here so the local backend has no Pinecone dependency)."""
+        from pinecone import Pinecone
+        
         self.api_key = os.getenv("PINECONE_API_KEY")
         if not self.api_key:
             raise ValueError("PINECONE_API_KEY environment variable not set")
         
         self.pc = Pinecone(api_key=self.api_key)
-        self.index_name = index_name
-        self.namespace = namespace
-        self.embeddings = OpenAIEmbeddings(model="text-embedding-3-small") # Efficient for legal text
-        self.dimension = 1536 # OpenAI embedding dimension
+        
+        # Skip list_indexes/describe_index round trips when this index was verified recently
+        host = self._cached_index_host()
+        if host is None:
+            self._ensure_index_exists()
+            host = self.pc.describe_index(self.index_name).host
+            self._remember_index_host(host)
+        self.index = self.pc.Index(self.index_name, host=host)
+
+    def _index_metadata_path(self) -> str:
+        return os.path.join(cache_dir(), "pinecone_indexes.json")
+
+    def _read_index_metadata(self) -> Dict[str, Any]:
+        try:
+            with open(self._index_metadata_path(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _cached_index_host(self) -> Optional[str]:
+        entry = self._read_index_metadata().get(self.index_name)
+        if not entry or entry.get("dimension") != self.dimension:
+            return None
+        if time.time() - entry.get("checked", 0) > self.INDEX_METADATA_TTL:
+            return None
+        return entry.get("host")
 
-        self._ensure_index_exists()
-        self.index = self.pc.Index(self.index_name)
+    def _remember_index_host(self, host: str):
+        metadata = self._read_index_metadata()
+        metadata[self.index_name] = {"host": host, "dimension": self.dimension, "checked": time.time()}
+        path = self._index_metadata_path()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+        os.replace(tmp_path, path)
 
     def _ensure_index_exists(self):
         """Checks if index exists, creates it if not."""
+        from pinecone import ServerlessSpec
+        
         existing_indexes = [i.name for i in self.pc.list_indexes()]
         
         if self.index_name not in existing_indexes:
@@ -49,64 +145,289 @@ class VectorStoreManager:
 
     def upsert_chunks(self, chunks: List[Dict[str, Any]], batch_size: int = 100):
         """
-        Embeds and upserts chunks into Pinecone.
+        Embeds and upserts chunks into the vector index.
         
         Args:
             chunks: List of structured chunks from PDFProcessor.
             batch_size: Number of vectors to upsert in one batch.
+            
+        Returns:
+            IDs of the vectors written.
         """
         print(f"Upserting {len(chunks)} chunks to namespace '{self.namespace}'...")
         
+        vector_ids = []
         for i in range(0, len(chunks), batch_size):
             batch = chunks[i:i + batch_size]
+            vector_ids.extend(self._upsert_batch(batch, list(range(i, i + len(batch)))))
+        return vector_ids
+
+    def upsert_stream(self, chunk_windows: Iterable[List[Dict[str, Any]]], batch_size: int = 100, prefetch: int = 2, prune: bool = False, skip_existing: bool = False) -> int:
+        """
+        Embeds and upserts chunks as they are produced, e.g. from PDFProcessor.iter_chunks.
+        
+        Parsing runs in a background thread and hands windows over through a bounded
+        queue: at most `prefetch` windows wait while a batch is being embedded, so memory
+        stays flat regardless of document length and the first vectors land in the index
+        before parsing finishes.
+        
+        Args:
+            chunk_windows: Iterable yielding lists of chunks.
+            batch_size: Number of vectors to upsert in one batch.
+            prefetch: Number of parsed windows allowed to wait for the embedder.
+            prune: Delete vectors in the namespace that this ingest did not write,
+                   e.g. clauses removed or edited since the last ingest.
+                   Skipped if any batch fails, so vectors are never deleted without
+                   their replacements having been written.
+            skip_existing: Don't re-embed or re-upsert chunks whose vector ID is already in
+                   the namespace. Since IDs are content-derived, only added or edited clauses
+                   are written, which makes re-ingesting a new contract version incremental.
             
-            # Prepare texts for embedding
-            texts = [c['raw_text'] for c in batch]
-            
+        Returns:
+            Number of chunks now indexed (written or already present); chunks in failed
+            batches are not counted.
+        """
+        print(f"Streaming chunks to namespace '{self.namespace}'...")
+        
+        existing_ids = self.list_ids() if skip_existing else set()
+        
+        windows = queue.Queue(maxsize=prefetch)
+        done = object()
+        stop = threading.Event()
+        
+        def produce():
             try:
-                # Generate Embeddings
-                embeds = self.embeddings.embed_documents(texts)
+                for window in chunk_windows:
+                    if stop.is_set():
+                        break
+                    windows.put(window)
+            except Exception as e:
+                windows.put(e)
+            finally:
+                windows.put(done)
+        
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+        
+        batch = []
+        positions = []
+        position = 0
+        total = 0
+        failed = 0
+        written_ids = set()
+        skipped = 0
+        try:
+            while True:
+                window = windows.get()
+                if window is done:
+                    break
+                if isinstance(window, Exception):
+                    raise window
                 
-                # Prepare Vectors
-                vectors = []
-                for j, chunk in enumerate(batch):
-                    # Create a unique ID: contract_id + hash or just sequential for now
-                    # Ideally, clause_id should be part of the ID for deduplication
-                    vector_id = f"{self.namespace}_{chunk['page_no']}_{i+j}" 
-                    
-                    metadata = {
-                        "page_no": chunk['page_no'],
-                        "section": chunk['section'],
-                        "clause_id": chunk['clause_id'],
-                        "raw_text": chunk['raw_text']
-                    }
-                    
-                    vectors.append({
-                        "id": vector_id,
-                        "values": embeds[j],
-                        "metadata": metadata
-                    })
+                for chunk in window:
+                    vector_id = self.vector_id(chunk)
+                    if vector_id in existing_ids:
+                        written_ids.add(vector_id)
+                        skipped += 1
+                    else:
+                        batch.append(chunk)
+                        positions.append(position)
+                    position += 1
+                while len(batch) >= batch_size:
+                    ids = self._upsert_batch(batch[:batch_size], positions[:batch_size])
+                    written_ids.update(ids)
+                    total += len(ids)
+                    failed += batch_size - len(ids)
+                    batch, positions = batch[batch_size:], positions[batch_size:]
+            
+            if batch:
+                ids = self._upsert_batch(batch, positions)
+                written_ids.update(ids)
+                total += len(ids)
+                failed += len(batch) - len(ids)
+        finally:
+            # On any error the producer may be blocked on the full queue: tell it to stop
+            # and drain until it exits, so no thread is left parsing in the background
+            stop.set()
+            while producer.is_alive():
+                try:
+                    windows.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            producer.join()
+        
+        print(f"Upserted {total} chunks." + (f" {skipped} unchanged chunks already indexed." if skipped else ""))
+        
+        if failed:
+            print(f"Warning: {failed} chunks failed to upsert to namespace '{self.namespace}'"
+                  + ("; skipping prune so existing vectors are kept." if prune else "."))
+        elif prune:
+            self.prune_stale(written_ids)
+        return total + skipped
+
+    def vector_id(self, chunk: Dict[str, Any], namespace: Optional[str] = None) -> str:
+        """
+        Deterministic vector ID derived from clause identity and content.
+        Re-upserting the same clause text overwrites in place, and the namespace prefix
+        lets stale IDs be listed and pruned in bulk.
+        """
+        clause = re.sub(r'[^A-Za-z0-9.()-]+', '_', str(chunk['clause_id']))
+        digest = text_hash(chunk['section'], str(chunk['clause_id']), chunk['raw_text'])[:16]
+        return f"{namespace or self.namespace}#{clause}#{digest}"
+
+    def _upsert_batch(self, batch: List[Dict[str, Any]], positions: List[int]) -> List[str]:
+        """
+        Embeds and upserts a single batch. `positions` are the chunks' positions in the document.
+        
+        Returns:
+            IDs of the vectors written (empty if the batch failed).
+        """
+        # Prepare texts for embedding
+        texts = [c['raw_text'] for c in batch]
+        
+        try:
+            # Generate Embeddings (cache hits skip the API)
+            embeds = self._embed_documents(texts)
+            
+            # Prepare Vectors
+            vectors = []
+            for j, chunk in enumerate(batch):
+                # Text, page and section are resolved locally from chunk_index
+                metadata = {
+                    "clause_id": chunk['clause_id'],
+                    "chunk_index": positions[j]
+                }
                 
-                # Upsert to Pinecone
+                vectors.append({
+                    "id": self.vector_id(chunk),
+                    "values": embeds[j],
+                    "metadata": metadata
+                })
+            
+            # Upsert to the index
+            with telemetry.span("vector_upsert"):
                 self.index.upsert(vectors=vectors, namespace=self.namespace)
-                
-            except Exception as e:
-                print(f"Error upserting batch {i}: {e}")
+            return [v["id"] for v in vectors]
+            
+        except Exception as e:
+            print(f"Error upserting batch {positions[0]}: {e}")
+            return []
+
+    def _embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embeds texts, serving repeats from the local embedding cache."""
+        if not self.embedding_cache:
+            return self._embed_remote(texts)
+        
+        embeds = self.embedding_cache.get_many(texts)
+        missing = [i for i, e in enumerate(embeds) if e is None]
+        telemetry.count("embedding_cache_hits", len(texts) - len(missing))
+        if missing:
+            fresh = self._embed_remote([texts[i] for i in missing])
+            self.embedding_cache.put_many([texts[i] for i in missing], fresh)
+            for i, vector in zip(missing, fresh):
+                embeds[i] = vector
+        return embeds
+
+    def _embed_remote(self, texts: List[str]) -> List[List[float]]:
+        with telemetry.span("embed", model=self.embedding_model):
+            embeds = self.embeddings.embed_documents(texts)
+        # The embeddings client does not report usage, so cost is estimated from the text
+        telemetry.record_tokens(self.embedding_model, sum(estimate_tokens(t) for t in texts))
+        return embeds
 
-    def query_similarity(self, query: str, top_k: int = 5) -> List[Dict]:
+    def list_ids(self) -> Set[str]:
+        """All vector IDs this manager has written to its namespace."""
+        ids = set()
+        for id_page in self.index.list(prefix=f"{self.namespace}#", namespace=self.namespace):
+            ids.update(id_page)
+        return ids
+
+    def prune_stale(self, live_ids: Set[str]) -> int:
+        """
+        Deletes vectors in this namespace that are not in `live_ids`.
+        
+        Returns:
+            Number of vectors deleted.
+        """
+        stale = [vid for vid in self.list_ids() if vid not in live_ids]
+        
+        for i in range(0, len(stale), self.DELETE_BATCH):
+            self.index.delete(ids=stale[i:i + self.DELETE_BATCH], namespace=self.namespace)
+        
+        if stale:
+            print(f"Pruned {len(stale)} stale vectors from namespace '{self.namespace}'.")
+        return len(stale)
+
+    def query_similarity(self, query: str, top_k: int = 5, namespace: Optional[str] = None) -> List[Dict]:
         """
         Queries the vector DB for similar content.
+        
+        Args:
+            query: Text to search for.
+            top_k: Number of matches to return.
+            namespace: Namespace to search; defaults to this manager's namespace.
         """
-        query_embedding = self.embeddings.embed_query(query)
+        query_embedding = self._embed_documents([query])[0]
         
-        response = self.index.query(
-            namespace=self.namespace,
-            vector=query_embedding,
-            top_k=top_k,
-            include_metadata=True
-        )
+        with telemetry.span("vector_query"):
+            response = self.index.query(
+                namespace=namespace or self.namespace,
+                vector=query_embedding,
+                top_k=top_k,
+                include_metadata=True
+            )
         
-        return response['matches']
+        return self.resolve_matches(response['matches'], namespace)
+
+    def query_similarity_batch(self, queries: List[str], top_k: int = 5) -> List[List[Dict]]:
+        """
+        Queries the vector DB for several texts at once.
+        The local backend scores all queries in a single matrix product; Pinecone is queried per text.
+        """
+        query_embeddings = self._embed_documents(queries)
+        
+        if hasattr(self.index, "query_batch"):
+            results = self.index.query_batch(query_embeddings, top_k=top_k, namespace=self.namespace)
+        else:
+            results = [
+                self.index.query(namespace=self.namespace, vector=vector, top_k=top_k, include_metadata=True)['matches']
+                for vector in query_embeddings
+            ]
+        return [self.resolve_matches(matches) for matches in results]
+
+    def _chunk_store(self, namespace: str):
+        """The namespace's chunks from its saved QuoteIndex, reloaded when the file changes."""
+        path = QuoteIndex.path_for(namespace)
+        mtime = os.path.getmtime(path) if os.path.exists(path) else None
+        cached = self._local_chunks.get(namespace)
+        if cached is None or cached[0] != mtime:
+            chunks = QuoteIndex.load_chunks(path) if mtime is not None else None
+            cached = (mtime, chunks or [], {})
+            self._local_chunks[namespace] = cached
+        return cached
+
+    def resolve_matches(self, matches: List[Any], namespace: Optional[str] = None) -> List[Dict]:
+        """
+        Returns matches as {"id", "score", "metadata"} dicts whose metadata carries the chunk's
+        page_no, section, clause_id and raw_text, looked up in the contract's local chunk store.
+        Matches that can't be resolved (e.g. not ingested on this machine) keep their stored metadata.
+        """
+        namespace = namespace or self.namespace
+        _, chunks, by_id = self._chunk_store(namespace)
+        resolved = []
+        for match in matches:
+            metadata = dict(match['metadata'] or {}) if 'metadata' in match else {}
+            index = metadata.get("chunk_index")
+            chunk = chunks[int(index)] if index is not None and 0 <= int(index) < len(chunks) else None
+            # Positions shift when a contract is re-ingested incrementally; fall back to the ID
+            if chunk is None or self.vector_id(chunk, namespace) != match['id']:
+                if not by_id and chunks:
+                    by_id.update((self.vector_id(c, namespace), c) for c in chunks)
+                chunk = by_id.get(match['id'])
+            if chunk is not None:
+                metadata.update(chunk.to_dict())
+            resolved.append({"id": match['id'], "score": match['score'], "metadata": metadata})
+        return resolved
 
 if __name__ == "__main__":
     # Smoke test requires API keys, so wrapping in try/except or just defining class
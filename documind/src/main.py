@@ -1,21 +1,65 @@
 import argparse
 import os
 import sys
+from typing import Dict, List
 from dotenv import load_dotenv
 
-from src.ingestion.pdf_parser import PDFProcessor
-from src.ingestion.vector_store import VectorStoreManager
-from src.analysis.langgraph_workflow import AuditWorkflow
-from src.reporting.summarizer_agent import SummarizerAgent
+from src.utils.telemetry import telemetry
+
+# Pipeline modules (LangChain, LangGraph, PyMuPDF, Pinecone behind them) are imported inside
+# main() once arguments are parsed, so --help and usage errors return without loading them.
 
 # Load environment variables
 load_dotenv()
 
+def _tee(chunk_windows, *consumers):
+    """Passes chunk windows through while handing each one to every consumer."""
+    for window in chunk_windows:
+        for consume in consumers:
+            consume(window)
+        yield window
+
+def _write_report(contract_name: str, findings_path: str, output_filename: str, llm_cache):
+    from src.reporting.summarizer_agent import SummarizerAgent
+    
+    print("\n[Phase 3] Generating Compliance Report...")
+    summarizer = SummarizerAgent(llm_cache=llm_cache)
+    summarizer.write_report_from_jsonl(contract_name, findings_path, output_filename)
+    print(f"Done! Report saved to: {output_filename}")
+    if llm_cache:
+        stats = llm_cache.stats()
+        print(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses ({stats['entries']} entries)")
+
+def _report_telemetry(telemetry_dir: str, run_name: str):
+    print("\n--- Telemetry ---")
+    for line in telemetry.summary():
+        print(line)
+    for contract, cost in sorted(telemetry.cost_by_contract().items()):
+        print(f"Estimated LLM cost{' for ' + contract if contract else ''}: ${cost:.4f}")
+    if telemetry_dir:
+        prometheus_path, trace_path = telemetry.export(telemetry_dir, run_name)
+        print(f"Metrics written to {prometheus_path}, trace to {trace_path}")
+
 def main():
     parser = argparse.ArgumentParser(description="DocuMind: Legal Contract Auditor")
-    parser.add_argument("pdf_path", help="Path to the PDF contract to audit")
+    parser.add_argument("pdf_path", help="Path to the PDF (or Markdown) contract to audit")
     parser.add_argument("--namespace", help="Pinecone namespace for this contract", default=None)
     parser.add_argument("--skip-ingest", action="store_true", help="Skip ingestion if already indexed")
+    parser.add_argument("--parse-workers", type=int, default=1, help="Processes used to parse the PDF (1 = serial)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Clauses audited concurrently (1 = serial)")
+    parser.add_argument("--rpm", type=float, default=None, help="Max LLM requests per minute across all clause audits")
+    parser.add_argument("--tpm", type=float, default=None, help="Max LLM tokens per minute across all clause audits")
+    parser.add_argument("--no-llm-cache", action="store_true", help="Always call the LLMs instead of reusing cached responses")
+    parser.add_argument("--llm-cache-ttl-hours", type=float, default=None, help="Expire cached LLM responses after this many hours")
+    parser.add_argument("--incremental", action="store_true", help="Only index and re-audit clauses that changed since the last run for this namespace")
+    parser.add_argument("--critic-batch-tokens", type=int, default=0, help="Pack clauses into batched critic calls up to this many tokens (0 = one clause per call)")
+    parser.add_argument("--resume", action="store_true", help="Skip clauses already completed by an interrupted run of this contract")
+    parser.add_argument("--dedup", action="store_true", help="Audit one representative per group of (near-)duplicate clauses and reuse verdicts stored by earlier runs")
+    parser.add_argument("--triage", action="store_true", help="Screen clauses with local rules and a cheaper model first; only escalated clauses reach the critic model")
+    parser.add_argument("--triage-model", default=None, help="Cheap screening model (default: DOCUMIND_TRIAGE_MODEL or gpt-4o-mini)")
+    parser.add_argument("--triage-confidence", type=float, default=None, help="Minimum confidence for the cheap model's COMPLIANT verdicts to be accepted (default 0.85)")
+    parser.add_argument("--telemetry-dir", default=None, help="Write a Prometheus textfile and a JSON trace of stage latencies, tokens and cost here")
+    parser.add_argument("--report-only", action="store_true", help="Re-render the report from the findings JSONL of a previous run without auditing")
     
     args = parser.parse_args()
     
@@ -24,21 +68,73 @@ def main():
         print(f"Error: File not found at {pdf_path}")
         sys.exit(1)
         
-    contract_name = os.path.basename(pdf_path).replace(".pdf", "")
+    contract_name = os.path.splitext(os.path.basename(pdf_path))[0]
     namespace = args.namespace or f"contract_{contract_name.lower().replace(' ', '_')}"
     
+    # Latencies, tokens and cost recorded from here on are labelled with this contract
+    telemetry.set_contract(namespace)
+    
+    findings_path = f"audit_findings_{contract_name}.jsonl"
+    output_filename = f"audit_report_{contract_name}.md"
+    
+    from src.utils.llm_cache import LLMResponseCache
+    
+    llm_cache = None
+    if not args.no_llm_cache:
+        ttl = args.llm_cache_ttl_hours * 3600 if args.llm_cache_ttl_hours else None
+        llm_cache = LLMResponseCache(ttl_seconds=ttl)
+    
+    if args.report_only:
+        if not os.path.exists(findings_path):
+            print(f"Error: No findings from a previous run at {findings_path}")
+            sys.exit(1)
+        _write_report(contract_name, findings_path, output_filename, llm_cache)
+        _report_telemetry(args.telemetry_dir, contract_name)
+        return
+    
     print(f"--- Starting DocuMind Audit for: {contract_name} ---")
     
+    from src.ingestion.pdf_parser import PDFProcessor
+    from src.ingestion.vector_store import VectorStoreManager
+    from src.ingestion.quote_index import QuoteIndex
+    from src.ingestion.chunk_manifest import ChunkManifest
+    from src.analysis.langgraph_workflow import AuditWorkflow
+    from src.analysis.audit_runner import run_audit
+    from src.analysis.incremental import AuditRecord
+    from src.analysis.checkpoint import AuditCheckpoint
+    from src.analysis.triage import ClauseTriage
+    from src.analysis.dedup import ClauseDeduplicator, VerdictStore, assign
+    from src.reporting.summarizer_agent import SummarizerAgent
+    from src.reporting.report_sink import ReportSink
+    from src.utils.hashing import file_hash
+    from src.utils.rate_limiter import RateLimiter
+    
+    # Parser output is cached per (PDF content, parser version): parse at most once
+    pdf_hash = file_hash(pdf_path)
+    manifest = ChunkManifest(PDFProcessor.PARSER_VERSION)
+    chunks = manifest.load(pdf_hash)
+    if chunks is not None:
+        print(f"Loaded {len(chunks)} chunks from the parse manifest.")
+    
     # --- PHASE 1: INGESTION ---
     if not args.skip_ingest:
         print("\n[Phase 1] Ingesting Document...")
         try:
-            processor = PDFProcessor()
-            chunks = processor.parse_pdf(pdf_path)
-            print(f"Parsed {len(chunks)} chunks.")
-            
             vs_manager = VectorStoreManager(namespace=namespace)
-            vs_manager.upsert_chunks(chunks)
+            
+            # Parse and index window by window so vectors land while parsing continues.
+            # The quote index used by the Reflector and the manifest are built from the same stream.
+            quote_index = QuoteIndex()
+            if chunks is not None:
+                chunk_windows = _tee([chunks], quote_index.add_chunks)
+            else:
+                chunks = []
+                chunk_windows = _tee(PDFProcessor().iter_chunks(pdf_path, workers=args.parse_workers), quote_index.add_chunks, chunks.extend)
+            
+            total = vs_manager.upsert_stream(chunk_windows, prune=True, skip_existing=args.incremental)
+            quote_index.save(QuoteIndex.path_for(namespace))
+            manifest.save(pdf_hash, chunks)
+            print(f"Parsed {total} chunks.")
             print("Ingestion Complete.")
         except Exception as e:
             print(f"Ingestion failed: {e}")
@@ -48,56 +144,108 @@ def main():
 
     # --- PHASE 2: AUDIT LOOP ---
     print("\n[Phase 2] Running Critic-Reflector Audit Loop...")
-    workflow = AuditWorkflow()
+    rate_limiter = RateLimiter(args.rpm, args.tpm) if (args.rpm or args.tpm) else None
+    triage = ClauseTriage(args.triage_model, args.triage_confidence, cache=llm_cache, rate_limiter=rate_limiter) if args.triage else None
+    workflow = AuditWorkflow(rate_limiter=rate_limiter, llm_cache=llm_cache, triage=triage)
     app = workflow.build_graph()
     
-    # Ideally, we iterate over all clauses. For CLI demo, we'll fetch all chunks 
-    # (or you'd use a separate logic to list clauses to check).
-    # Here we simulate valid clauses to check by re-reading the PDF structure momentarily
-    # or assuming we check a specific list. 
-    # For this implementation, let's re-parse to get the clause list to iterate over.
-    processor = PDFProcessor()
-    chunks = processor.parse_pdf(pdf_path)
+    # The clause list comes from the chunks parsed (or loaded) above; only parse here
+    # when ingestion was skipped and this PDF has no manifest yet.
+    if chunks is None:
+        try:
+            chunks = PDFProcessor().parse_pdf(pdf_path, workers=args.parse_workers)
+        except Exception as e:
+            print(f"Parsing failed: {e}")
+            sys.exit(1)
+        manifest.save(pdf_hash, chunks)
     
     # Filter for chunks that look like clause definitions
     clauses_to_check = [c for c in chunks if c['clause_id'] != "General"]
     print(f"identified {len(clauses_to_check)} specific clauses to audit.")
     
-    audit_findings = []
+    # Diff-aware mode: carry findings forward for clauses unchanged since the previous run
+    results = [None] * len(clauses_to_check)
+    previous = AuditRecord.load(namespace) if args.incremental else None
+    if previous:
+        results, counts = previous.carry_forward(clauses_to_check)
+        print(f"Incremental audit vs previous run: {counts['unchanged']} unchanged, {counts['modified']} modified, "
+              f"{counts['added']} added, {counts['removed']} removed.")
+    
+    # Every finished clause is checkpointed durably; --resume picks up where a crashed run stopped
+    checkpoint = AuditCheckpoint(namespace, pdf_hash, resume=args.resume)
+    if args.resume:
+        resumed = 0
+        for i, finding in enumerate(checkpoint.completed(clauses_to_check)):
+            if finding and results[i] is None:
+                results[i] = finding
+                resumed += 1
+        print(f"Resuming: {resumed} clauses already completed by a previous run.")
+    pending = [i for i, finding in enumerate(results) if finding is None]
     
-    for i, clause in enumerate(clauses_to_check):
-        print(f"Analyzing Clause {clause['clause_id']} ({i+1}/{len(clauses_to_check)})...")
+    # Dedup: boilerplate repeated within the contract (or seen in earlier contracts) is audited once
+    deduplicator = None
+    duplicates: Dict[int, List[int]] = {}
+    if args.dedup:
+        deduplicator = ClauseDeduplicator(VerdictStore(workflow.verdict_version()))
+        representatives, reused = [], 0
+        for group in deduplicator.group([clauses_to_check[i] for i in pending]):
+            group = [pending[g] for g in group]
+            stored = deduplicator.lookup(clauses_to_check[group[0]])
+            if stored:
+                for i in group:
+                    results[i] = assign(stored, clauses_to_check[i])
+                    checkpoint.record(i, clauses_to_check[i], results[i])
+                reused += len(group)
+            else:
+                representatives.append(group[0])
+                duplicates[group[0]] = group[1:]
+        print(f"Dedup: {len(pending)} clauses -> {len(representatives)} representatives, {reused} verdicts reused from earlier runs.")
+        pending = representatives
+    clauses_to_audit = [clauses_to_check[i] for i in pending]
+    print(f"Auditing {len(clauses_to_audit)} clauses.")
+    
+    # Findings are streamed to disk as they are produced: JSONL for tools/re-rendering,
+    # plus a Markdown progress file of the non-compliant ones
+    progress_path = f"audit_report_{contract_name}.progress.md"
+    with ReportSink(findings_path, progress_path, SummarizerAgent.render_finding) as sink:
+        for i, finding in enumerate(results):
+            if finding:
+                sink.write(i, finding)
         
-        initial_state = {
-            "clause": clause,
-            "contract_namespace": namespace,
-            "critic_finding": None,
-            "verification_result": None,
-            "attempts": 0,
-            "final_output": None
-        }
+        prefilled = None
+        if args.critic_batch_tokens:
+            prefilled = workflow.critic_batch(clauses_to_audit, args.critic_batch_tokens, concurrency=args.concurrency)
         
-        try:
-            # Run the LangGraph
-            final_state = app.invoke(initial_state)
-            
-            # Extract finding from final state (critic_finding is the last output)
-            if final_state.get('critic_finding'):
-                audit_findings.append(final_state['critic_finding'])
-                
-        except Exception as e:
-            print(f"Error auditing clause {clause['clause_id']}: {e}")
+        def on_finding(i, finding, verification):
+            checkpoint.record(pending[i], clauses_to_audit[i], finding)
+            sink.write(pending[i], finding)
+            if deduplicator:
+                deduplicator.remember(clauses_to_audit[i], finding, bool(verification and verification.get("verified")))
+                for member in duplicates[pending[i]]:
+                    member_finding = assign(finding, clauses_to_check[member])
+                    checkpoint.record(member, clauses_to_check[member], member_finding)
+                    sink.write(member, member_finding)
+        
+        audited = run_audit(app, clauses_to_audit, namespace, concurrency=args.concurrency, prefilled=prefilled,
+                            on_finding=on_finding)
+    for i, finding in zip(pending, audited):
+        results[i] = finding
+        for member in duplicates.get(i, []):
+            results[member] = assign(finding, clauses_to_check[member]) if finding else None
+    
+    if triage:
+        print(triage.summary())
+    
+    AuditRecord(namespace, pdf_hash, clauses_to_check, results).save()
+    if all(finding and finding.get("status") != "ERROR" for finding in results):
+        checkpoint.discard()
+    else:
+        checkpoint.close()
+        print("Some clauses failed; rerun with --resume to retry only those.")
 
     # --- PHASE 3: REPORTING ---
-    print("\n[Phase 3] Generating Compliance Report...")
-    summarizer = SummarizerAgent()
-    report_md = summarizer.generate_report(contract_name, audit_findings)
-    
-    output_filename = f"audit_report_{contract_name}.md"
-    with open(output_filename, "w", encoding="utf-8") as f:
-        f.write(report_md)
-        
-    print(f"Done! Report saved to: {output_filename}")
+    _write_report(contract_name, findings_path, output_filename, llm_cache)
+    _report_telemetry(args.telemetry_dir, contract_name)
 
 if __name__ == "__main__":
     main()
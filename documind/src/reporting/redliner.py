@@ -1,14 +1,20 @@
-from typing import Dict, Any
-from langchain_openai import ChatOpenAI
+from typing import Dict, Any, Optional
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from src.utils.llm_cache import LLMResponseCache, cached_invoke
+from src.utils.llm_provider import get_provider
+from src.utils.telemetry import telemetry
 
 class AutoRedliner:
     """
     Generates suggested revisions for clauses that violate the law.
     """
-    def __init__(self, model_name: str = "gpt-4o"):
-        self.llm = ChatOpenAI(model=model_name, temperature=0.2)
+    PROMPT_VERSION = "redline-v1"
+
+    def __init__(self, model_name: str = "gpt-4o", cache: Optional[LLMResponseCache] = None):
+        self.model_name = model_name
+        self.llm = get_provider().chat(model_name, temperature=0.2)
+        self.cache = cache
         
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """You are a Legal Expert. 
@@ -38,12 +44,14 @@ class AutoRedliner:
         if finding.get("status") != "VIOLATION":
             return ""
             
+        inputs = {
+            "clause_text": finding.get("source_verification", "") or "Text unavailable",
+            "reasoning": finding.get("reasoning", ""),
+            "law_reference": finding.get("law_reference", "")
+        }
         try:
-            return self.chain.invoke({
-                "clause_text": finding.get("source_verification", "") or "Text unavailable",
-                "reasoning": finding.get("reasoning", ""),
-                "law_reference": finding.get("law_reference", "")
-            })
+            with telemetry.span("redline"):
+                return cached_invoke(self.cache, self.model_name, self.PROMPT_VERSION, inputs, lambda: self.chain.invoke(inputs))
         except Exception as e:
             print(f"Error generating redline: {e}")
             return "Error generating suggestion."
@@ -0,0 +1,68 @@
+import json
+import threading
+from typing import Dict, Any, Callable, Iterator, Optional
+
+class ReportSink:
+    """
+    Streams audit findings to disk as the audit loop produces them.
+
+    Every finding is appended to a JSONL file (one JSON object per line, flushed
+    immediately) so progress can be tailed and the report re-rendered later without
+    re-running the audit. Non-compliant findings can also be appended to a Markdown
+    progress file as they arrive.
+    """
+    def __init__(self, jsonl_path: str, markdown_path: Optional[str] = None, render_finding: Optional[Callable[[Dict[str, Any]], str]] = None):
+        self.jsonl_path = jsonl_path
+        self.markdown_path = markdown_path
+        self.render_finding = render_finding
+        self._lock = threading.Lock()
+        self._jsonl = open(jsonl_path, "w", encoding="utf-8")
+        self._markdown = open(markdown_path, "w", encoding="utf-8") if markdown_path else None
+
+    def write(self, clause_index: int, finding: Dict[str, Any]):
+        """
+        Appends one finding. `clause_index` is the clause's position in the audit order;
+        findings may arrive out of order when clauses are audited concurrently.
+        """
+        line = json.dumps({"clause_index": clause_index, **finding}, ensure_ascii=False)
+        with self._lock:
+            self._jsonl.write(line + "\n")
+            self._jsonl.flush()
+            if self._markdown and self.render_finding and finding.get("status") != "COMPLIANT":
+                self._markdown.write(self.render_finding(finding))
+                self._markdown.flush()
+
+    def close(self):
+        self._jsonl.close()
+        if self._markdown:
+            self._markdown.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def iter_findings(jsonl_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yields findings from a ReportSink JSONL file in clause order.
+
+    Only (clause_index, file offset) pairs are held in memory; each finding is read
+    back from disk when its turn comes. A truncated last line (e.g. after a crash) is skipped.
+    """
+    positions = []
+    with open(jsonl_path, "rb") as f:
+        offset = 0
+        for line in f:
+            try:
+                positions.append((json.loads(line)["clause_index"], offset))
+            except (ValueError, KeyError):
+                pass
+            offset += len(line)
+        positions.sort()
+
+        for _, offset in positions:
+            f.seek(offset)
+            finding = json.loads(f.readline())
+            finding.pop("clause_index", None)
+            yield finding
@@ -4,6 +4,13 @@ class RiskEngine:
     """
     Calculates a qualitative Risk Score for the contract based on verified violations.
     """
+    # Keywords that mark a violation's severity, most severe first (also used by the triage screen)
+    SEVERITY_KEYWORDS = (
+        ("CRITICAL", ("termination", "liability", "indemnity", "penalty")),
+        ("HIGH", ("payment", "confidentiality", "intellectual property")),
+        ("MEDIUM", ("notice", "jurisdiction")),
+    )
+
     def __init__(self):
         # Weighting for different types of violations (could be dynamic or fine-tuned)
         self.severity_map = {
@@ -52,12 +59,9 @@ class RiskEngine:
     def _infer_severity(self, finding: Dict) -> str:
         text = (finding.get("reasoning", "") + " " + finding.get("clause_id", "")).lower()
         
-        if any(x in text for x in ["termination", "liability", "indemnity", "penalty"]):
-            return "CRITICAL"
-        if any(x in text for x in ["payment", "confidentiality", "intellectual property"]):
-            return "HIGH"
-        if any(x in text for x in ["notice", "jurisdiction"]):
-            return "MEDIUM"
+        for severity, keywords in self.SEVERITY_KEYWORDS:
+            if any(x in text for x in keywords):
+                return severity
         return "LOW"
 
     def _get_level_label(self, score: int) -> str:
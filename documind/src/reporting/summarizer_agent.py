@@ -1,21 +1,34 @@
-from typing import List, Dict, Any
-from langchain_openai import ChatOpenAI
+import os
+import shutil
+from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from src.reporting.risk_engine import RiskEngine
 from src.reporting.redliner import AutoRedliner
+from src.reporting.report_sink import iter_findings
+from src.utils.llm_cache import LLMResponseCache, cached_invoke
+from src.utils.llm_provider import get_provider
+from src.utils.telemetry import telemetry, bind_context
 
 class SummarizerAgent:
     """
     Aggregates findings, calculates risk, generates redlines, 
     and produces a final Markdown report.
     """
-    def __init__(self):
+    PROMPT_VERSION = "summary-v2"
+
+    def __init__(self, llm_cache: Optional[LLMResponseCache] = None, max_workers: int = 8):
         self.risk_engine = RiskEngine()
-        self.redliner = AutoRedliner()
+        self.redliner = AutoRedliner(cache=llm_cache)
         # Using GPT-4o as a proxy for JAIS if JAIS API acts as OpenAI-compatible
         # or separate logic would be needed.
-        self.llm = ChatOpenAI(model="gpt-4o", temperature=0)
+        self.model_name = "gpt-4o"
+        self.llm = get_provider().chat(self.model_name, temperature=0)
+        self.cache = llm_cache
+        # Bound on concurrent LLM calls (redlines + summaries) while building a report
+        self.max_workers = max_workers
 
     def generate_report(self, contract_name: str, findings: List[Dict[str, Any]]) -> str:
         """
@@ -24,19 +37,71 @@ class SummarizerAgent:
         # 1. Analytics
         risk_data = self.risk_engine.calculate_risk(findings)
         
-        # 2. Enrich Findings with Redlines
-        enriched_findings = []
-        for f in findings:
-            if f['status'] == 'VIOLATION':
-                f['suggested_fix'] = self.redliner.generate_fix(f)
-            enriched_findings.append(f)
+        # 2 & 3. Redlines and narrative sections are independent LLM calls, so they run
+        # concurrently. The summaries are based on the findings as audited (without fixes),
+        # and fixes are attached in finding order, so the report is deterministic.
+        violations = [f for f in findings if f['status'] == 'VIOLATION']
+        violation_sample = [dict(f) for f in violations[:3]]
+        
+        # Executor threads keep the caller's telemetry labels (e.g. the contract)
+        generate_summary, generate_fix = bind_context(self._generate_summary), bind_context(self.redliner.generate_fix)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            english_summary = executor.submit(generate_summary, contract_name, risk_data, violation_sample, "English")
+            arabic_summary = executor.submit(generate_summary, contract_name, risk_data, violation_sample, "Arabic")
+            fixes = executor.map(generate_fix, violations)
+            
+            for f, fix in zip(violations, fixes):
+                f['suggested_fix'] = fix
+            english_summary = english_summary.result()
+            arabic_summary = arabic_summary.result()
+        
+        parts = [self._render_header(contract_name, risk_data, english_summary, arabic_summary)]
+        parts.extend(self.render_finding(f) for f in findings if f['status'] != 'COMPLIANT')
+        return "".join(parts)
+
+    def write_report_from_jsonl(self, contract_name: str, findings_path: str, output_path: str, window: int = 64) -> str:
+        """
+        Renders the full report from a findings JSONL file written by ReportSink.
+        
+        Findings are streamed from disk in clause order and redlined `window` at a time, so
+        memory stays bounded for contracts with thousands of findings. Can be run again on
+        an existing JSONL file without re-running the audit.
+        
+        Returns:
+            output_path
+        """
+        risk_data = self.risk_engine.calculate_risk(iter_findings(findings_path))
+        violation_sample = list(islice((f for f in iter_findings(findings_path) if f['status'] == 'VIOLATION'), 3))
+        details_path = output_path + ".details"
+        
+        # Executor threads keep the caller's telemetry labels (e.g. the contract)
+        generate_summary, generate_fix = bind_context(self._generate_summary), bind_context(self.redliner.generate_fix)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            english_summary = executor.submit(generate_summary, contract_name, risk_data, violation_sample, "English")
+            arabic_summary = executor.submit(generate_summary, contract_name, risk_data, violation_sample, "Arabic")
+            
+            # Detailed sections go to a side file while the summaries for the header are pending
+            with open(details_path, "w", encoding="utf-8") as details:
+                findings = (f for f in iter_findings(findings_path) if f['status'] != 'COMPLIANT')
+                while True:
+                    batch = list(islice(findings, window))
+                    if not batch:
+                        break
+                    violations = [f for f in batch if f['status'] == 'VIOLATION']
+                    for f, fix in zip(violations, executor.map(generate_fix, violations)):
+                        f['suggested_fix'] = fix
+                    details.write("".join(self.render_finding(f) for f in batch))
             
-        # 3. Generate Narrative Sections
-        english_summary = self._generate_summary(contract_name, risk_data, enriched_findings, "English")
-        arabic_summary = self._generate_summary(contract_name, risk_data, enriched_findings, "Arabic")
+            header = self._render_header(contract_name, risk_data, english_summary.result(), arabic_summary.result())
         
-        # 4. Assemble Markdown
-        report = f"""# DocuMind Compliance Report: {contract_name}
+        with open(output_path, "w", encoding="utf-8") as out, open(details_path, "r", encoding="utf-8") as details:
+            out.write(header)
+            shutil.copyfileobj(details, out)
+        os.remove(details_path)
+        return output_path
+
+    def _render_header(self, contract_name: str, risk_data: Dict[str, Any], english_summary: str, arabic_summary: str) -> str:
+        return f"""# DocuMind Compliance Report: {contract_name}
 
 ## 📊 Executive Summary
 **Overall Risk Score**: {risk_data['risk_score']}/100 ({risk_data['risk_level']})
@@ -63,20 +128,19 @@ class SummarizerAgent:
 ## 🔍 Detailed Findings & Redlines
 
 """
-        for f in enriched_findings:
-            if f['status'] == 'COMPLIANT':
-                continue
-                
-            icon = "🔴" if f['status'] == 'VIOLATION' else "⚠️"
-            report += f"### {icon} Clause {f['clause_id']}\n"
-            report += f"**Status**: {f['status']}\n\n"
-            report += f"**Finding**: {f['reasoning']}\n\n"
-            report += f"**Law**: {f['law_reference']}\n\n"
-            if f.get('suggested_fix'):
-                 report += f"> **Suggested Fix**: *{f['suggested_fix']}*\n\n"
-            report += "---\n"
-            
-        return report
+
+    @staticmethod
+    def render_finding(f: Dict[str, Any]) -> str:
+        """Markdown section for a single (non-compliant) finding."""
+        icon = "🔴" if f['status'] == 'VIOLATION' else "⚠️"
+        section = f"### {icon} Clause {f['clause_id']}\n"
+        section += f"**Status**: {f['status']}\n\n"
+        section += f"**Finding**: {f.get('reasoning', '')}\n\n"
+        section += f"**Law**: {f.get('law_reference', '')}\n\n"
+        if f.get('suggested_fix'):
+            section += f"> **Suggested Fix**: *{f['suggested_fix']}*\n\n"
+        section += "---\n"
+        return section
 
     def _generate_summary(self, name: str, risk: Dict, findings: List[Dict], language: str) -> str:
         """Helper to generate a narrative summary in a specific language."""
@@ -95,4 +159,5 @@ class SummarizerAgent:
         {str([f for f in findings if f['status'] == 'VIOLATION'][:3])}
         """
         
-        return self.llm.invoke(prompt).content
+        with telemetry.span("summary", language=language):
+            return cached_invoke(self.cache, self.model_name, self.PROMPT_VERSION, {"prompt": prompt}, lambda: self.llm.invoke(prompt).content)
@@ -0,0 +1,21 @@
+import hashlib
+
+def text_hash(*parts: str) -> str:
+    """
+    Stable SHA-256 hex digest over one or more strings.
+    Parts are NUL-separated so ("ab", "c") and ("a", "bc") hash differently.
+    """
+    h = hashlib.sha256()
+    for i, part in enumerate(parts):
+        if i:
+            h.update(b"\0")
+        h.update(part.encode("utf-8"))
+    return h.hexdigest()
+
+def file_hash(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 hex digest of a file's contents, read in blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
@@ -0,0 +1,117 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from src.utils.hashing import text_hash
+from src.utils.paths import cache_dir
+from src.utils.telemetry import telemetry
+
+class LLMResponseCache:
+    """
+    Persistent SQLite cache of LLM responses, keyed by model, prompt template version
+    and the rendered inputs. Reruns over unchanged contracts are served from disk.
+
+    Entries expire after `ttl_seconds` (if set), and the least recently used entries are
+    evicted once the cache holds more than `max_entries`.
+    """
+    # Share of entries dropped at once when the cache is over capacity
+    EVICT_FRACTION = 0.1
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 50000, ttl_seconds: Optional[float] = None):
+        self.path = path or os.path.join(cache_dir(), "llm_responses.sqlite")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def key(model: str, template_version: str, inputs: Dict[str, Any]) -> str:
+        return text_hash(model, template_version, json.dumps(inputs, sort_keys=True, ensure_ascii=False))
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self._count -= 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Any):
+        now = time.time()
+        with self._lock:
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO responses (key, value, created, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now)
+            ).rowcount
+            if not inserted:
+                self._conn.execute(
+                    "UPDATE responses SET value = ?, created = ?, last_access = ? WHERE key = ?",
+                    (json.dumps(value, ensure_ascii=False), now, now, key)
+                )
+            self._count += inserted
+            if self._count > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def delete(self, key: str):
+        """Drops one entry, e.g. a response found to be wrong, so it is not served again."""
+        with self._lock:
+            self._count -= self._conn.execute("DELETE FROM responses WHERE key = ?", (key,)).rowcount
+            self._conn.commit()
+
+    def _evict(self):
+        """Drops expired entries, then the least recently used ones down to below capacity."""
+        if self.ttl_seconds is not None:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,))
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = self._count - int(self.max_entries * (1 - self.EVICT_FRACTION))
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                (excess,)
+            )
+            self._count -= excess
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": self._count}
+
+def cached_invoke(cache: Optional[LLMResponseCache], model: str, template_version: str, inputs: Dict[str, Any], invoke: Callable[[], Any], refresh: bool = False) -> Any:
+    """
+    Returns the cached response for (model, template_version, inputs), or calls `invoke()`
+    and caches its result. Exceptions are not cached. With no cache, just calls `invoke()`.
+    With `refresh`, any cached response is ignored and overwritten by a fresh call.
+    """
+    if cache is None:
+        with telemetry.span("llm_call", model=model, prompt=template_version):
+            return invoke()
+    key = cache.key(model, template_version, inputs)
+    cached = None if refresh else cache.get(key)
+    if cached is not None:
+        telemetry.count("llm_cache_hits", prompt=template_version)
+        return cached
+    with telemetry.span("llm_call", model=model, prompt=template_version):
+        result = invoke()
+    cache.put(key, result)
+    return result
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+from src.utils.telemetry import telemetry
+
+# httpx and langchain_openai are imported when the first client is created
+if TYPE_CHECKING:
+    import httpx
+    from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+class _SharedBackoff:
+    """
+    Pipeline-wide cool-down after a 429. When any client is rate-limited, every client
+    waits out the server's Retry-After before sending more, instead of each one
+    discovering the limit separately.
+    """
+    # Used when a 429 carries no usable Retry-After header
+    DEFAULT_DELAY = 1.0
+    MAX_DELAY = 60.0
+
+    def __init__(self):
+        self._until = 0.0
+        self._lock = threading.Lock()
+
+    def remaining(self) -> float:
+        return max(0.0, self._until - time.monotonic())
+
+    def on_response(self, response: "httpx.Response"):
+        if response.status_code != 429:
+            return
+        try:
+            delay = float(response.headers.get("retry-after", self.DEFAULT_DELAY))
+        except ValueError:
+            delay = self.DEFAULT_DELAY
+        with self._lock:
+            self._until = max(self._until, time.monotonic() + min(delay, self.MAX_DELAY))
+        telemetry.count("llm_rate_limited")
+
+    def before_request(self, request: "httpx.Request"):
+        wait = self.remaining()
+        if wait:
+            telemetry.observe("llm_backoff_wait", wait)
+            time.sleep(wait)
+
+    async def before_request_async(self, request: "httpx.Request"):
+        wait = self.remaining()
+        if wait:
+            telemetry.observe("llm_backoff_wait", wait)
+            await asyncio.sleep(wait)
+
+    async def on_response_async(self, response: "httpx.Response"):
+        self.on_response(response)
+
+class LLMProvider:
+    """
+    Hands out chat and embedding clients that share one pooled, keep-alive HTTP client
+    (sync and async), one retry policy and one 429 back-off.
+
+    Settings come from arguments or the environment:
+        DOCUMIND_LLM_BASE_URL         OpenAI-compatible endpoint used for the whole pipeline
+                                      (e.g. a local server); defaults to OpenAI
+        DOCUMIND_LLM_MAX_CONNECTIONS  connection pool size (default 64)
+        DOCUMIND_LLM_MAX_RETRIES      retries per request, with exponential back-off (default 6)
+        DOCUMIND_LLM_TIMEOUT          request timeout in seconds (default 60)
+    """
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None, max_connections: Optional[int] = None,
+                 max_retries: Optional[int] = None, timeout: Optional[float] = None):
+        self.base_url = base_url or os.getenv("DOCUMIND_LLM_BASE_URL") or None
+        # Local OpenAI-compatible servers usually accept any key
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY") or ("not-needed" if self.base_url else None)
+        self.max_connections = max_connections or int(os.getenv("DOCUMIND_LLM_MAX_CONNECTIONS", "64"))
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv("DOCUMIND_LLM_MAX_RETRIES", "6"))
+        self.timeout = timeout or float(os.getenv("DOCUMIND_LLM_TIMEOUT", "60"))
+
+        self.backoff = _SharedBackoff()
+        self._lock = threading.Lock()
+        self._http_client: Optional["httpx.Client"] = None
+        self._http_async_client: Optional["httpx.AsyncClient"] = None
+        self._chat_models: Dict[Tuple[str, float], "ChatOpenAI"] = {}
+        self._embedding_models: Dict[str, "OpenAIEmbeddings"] = {}
+
+    def _limits(self) -> "httpx.Limits":
+        import httpx
+        return httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+
+    def http_client(self) -> "httpx.Client":
+        import httpx
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client(
+                    limits=self._limits(),
+                    timeout=self.timeout,
+                    event_hooks={"request": [self.backoff.before_request], "response": [self.backoff.on_response]}
+                )
+            return self._http_client
+
+    def http_async_client(self) -> "httpx.AsyncClient":
+        import httpx
+        with self._lock:
+            if self._http_async_client is None:
+                self._http_async_client = httpx.AsyncClient(
+                    limits=self._limits(),
+                    timeout=self.timeout,
+                    event_hooks={"request": [self.backoff.before_request_async], "response": [self.backoff.on_response_async]}
+                )
+            return self._http_async_client
+
+    def chat(self, model: str, temperature: float = 0) -> "ChatOpenAI":
+        """Shared chat model for (model, temperature); token usage is reported to telemetry."""
+        key = (model, temperature)
+        if key not in self._chat_models:
+            from langchain_openai import ChatOpenAI
+            client = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                base_url=self.base_url,
+                api_key=self.api_key,
+                max_retries=self.max_retries,
+                timeout=self.timeout,
+                http_client=self.http_client(),
+                http_async_client=self.http_async_client(),
+                callbacks=[telemetry.callback(model)]
+            )
+            with self._lock:
+                self._chat_models.setdefault(key, client)
+        return self._chat_models[key]
+
+    def embeddings(self, model: str) -> "OpenAIEmbeddings":
+        """Shared embeddings client for `model`."""
+        if model not in self._embedding_models:
+            from langchain_openai import OpenAIEmbeddings
+            client = OpenAIEmbeddings(
+                model=model,
+                base_url=self.base_url,
+                api_key=self.api_key,
+                max_retries=self.max_retries,
+                request_timeout=self.timeout,
+                http_client=self.http_client(),
+                http_async_client=self.http_async_client(),
+                # Local servers don't accept pre-tokenized input
+                check_embedding_ctx_length=self.base_url is None
+            )
+            with self._lock:
+                self._embedding_models.setdefault(model, client)
+        return self._embedding_models[model]
+
+_provider: Optional[LLMProvider] = None
+_provider_lock = threading.Lock()
+
+def get_provider() -> LLMProvider:
+    """Process-wide provider, created from the environment on first use."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = LLMProvider()
+        return _provider
+
+def set_provider(provider: LLMProvider):
+    """Replaces the process-wide provider, e.g. to point the pipeline at another endpoint."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
@@ -0,0 +1,10 @@
+import os
+
+def cache_dir(*parts: str) -> str:
+    """
+    Returns (and creates) a directory under the local DocuMind cache root.
+    The root defaults to `.documind_cache` and can be moved with DOCUMIND_CACHE_DIR.
+    """
+    path = os.path.join(os.getenv("DOCUMIND_CACHE_DIR", ".documind_cache"), *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,53 @@
+import threading
+import time
+from typing import Optional
+from src.utils.telemetry import telemetry
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (~4 characters per token for English legal text)."""
+    return len(text) // 4 + 1
+
+class _Bucket:
+    """Token bucket that refills continuously up to one minute's worth of capacity."""
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Takes `amount` from the bucket (possibly going negative) and returns the wait in seconds."""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        self.level -= amount
+        return max(0.0, -self.level / self.rate)
+
+class RateLimiter:
+    """
+    Shared requests-per-minute and tokens-per-minute limiter for LLM calls.
+
+    Callers reserve capacity up front and then sleep off any deficit, so concurrent
+    callers queue fairly instead of all retrying at once. Thread-safe, so it can be
+    shared between LangGraph nodes running in executor threads.
+    """
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        self._requests = _Bucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = _Bucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: int) -> float:
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            if self._requests:
+                wait = max(wait, self._requests.reserve(1, now))
+            if self._tokens:
+                wait = max(wait, self._tokens.reserve(tokens, now))
+            return wait
+
+    def acquire(self, tokens: int = 0):
+        """Blocks until one request of `tokens` estimated tokens may be sent."""
+        wait = self._reserve(tokens)
+        if wait:
+            telemetry.observe("rate_limit_wait", wait)
+            time.sleep(wait)
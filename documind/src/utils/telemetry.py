@@ -0,0 +1,262 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from typing import Dict, Any, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# USD per 1M tokens (prompt, completion); used for cost estimates only
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+}
+
+# Trace events kept in memory; later events are counted but dropped
+MAX_TRACE_EVENTS = 200000
+
+# Contract the current thread/task is working on, used to label everything it records
+_current_contract: ContextVar[str] = ContextVar("documind_contract", default="")
+
+def bind_context(fn):
+    """
+    Wraps `fn` so every call runs in a copy of the caller's current context, e.g. to keep
+    the contract label on work handed to executor threads.
+    """
+    context = copy_context()
+    return lambda *args, **kwargs: context.copy().run(fn, *args, **kwargs)
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = (k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"' for k, v in labels)
+    return "{" + ",".join(escaped) + "}"
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.samples = 0
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += seconds
+        self.samples += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (an over-estimate, like Prometheus)."""
+        target = q * self.samples
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else float("inf")
+        return 0.0
+
+class Telemetry:
+    """
+    In-process metrics and trace recorder for the audit pipeline.
+
+    Stages record latency histograms (labelled by stage and contract), LLM calls record
+    token usage and estimated cost, and notable events (retries, cache hits) are counted.
+    Everything stays in memory and is exported at the end of a run as a Prometheus
+    textfile (for node_exporter's textfile collector) and a Chrome/Perfetto JSON trace.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Tuple], _Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._events: List[Dict[str, Any]] = []
+        self._dropped_events = 0
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def contract(self, name: str):
+        """Labels everything recorded inside this block (in this thread or task) with `name`."""
+        token = _current_contract.set(name)
+        try:
+            yield
+        finally:
+            _current_contract.reset(token)
+
+    def set_contract(self, name: str):
+        """Labels everything recorded from here on in the current thread or task with `name`."""
+        _current_contract.set(name)
+
+    def _labels(self, labels: Dict[str, Any]) -> Dict[str, Any]:
+        contract = _current_contract.get()
+        return {"contract": contract, **labels} if contract and "contract" not in labels else labels
+
+    @contextmanager
+    def span(self, stage: str, **labels):
+        """Times the enclosed block as one `stage` observation and one trace event."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, start, **labels)
+
+    def observe(self, stage: str, seconds: float, start: Optional[float] = None, **labels):
+        """Records a stage latency measured elsewhere; `start` is a perf_counter() timestamp."""
+        labels = self._labels(labels)
+        if start is None:
+            start = time.perf_counter() - seconds
+        event = {
+            "name": stage,
+            "ph": "X",
+            "ts": round((start - self._origin) * 1e6),
+            "dur": round(seconds * 1e6),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": labels,
+        }
+        key = (stage, _label_key(labels))
+        with self._lock:
+            self._histograms.setdefault(key, _Histogram()).observe(seconds)
+            if len(self._events) < MAX_TRACE_EVENTS:
+                self._events.append(event)
+            else:
+                self._dropped_events += 1
+
+    def count(self, event: str, value: float = 1, **labels):
+        key = (event, _label_key(self._labels(labels)))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def record_tokens(self, model: str, prompt_tokens: int, completion_tokens: int = 0):
+        """Counts an LLM or embedding call's tokens and its estimated cost in USD."""
+        self.count("llm_tokens_total", prompt_tokens, model=model, kind="prompt")
+        if completion_tokens:
+            self.count("llm_tokens_total", completion_tokens, model=model, kind="completion")
+        prompt_price, completion_price = MODEL_PRICES.get(model, (0.0, 0.0))
+        self.count("llm_cost_usd_total", (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1e6, model=model)
+
+    def callback(self, model: str):
+        """LangChain callback that records token usage reported by `model`'s API responses."""
+        return _token_usage_callback_class()(self, model)
+
+    def cost_by_contract(self) -> Dict[str, float]:
+        costs: Dict[str, float] = {}
+        with self._lock:
+            for (name, labels), value in self._counters.items():
+                if name == "llm_cost_usd_total":
+                    contract = dict(labels).get("contract", "")
+                    costs[contract] = costs.get(contract, 0.0) + value
+        return costs
+
+    def export(self, directory: str, run_name: str) -> Tuple[str, str]:
+        """
+        Writes `documind_{run_name}.prom` and `trace_{run_name}.json` into `directory`.
+
+        Returns:
+            (prometheus_path, trace_path)
+        """
+        os.makedirs(directory, exist_ok=True)
+        prometheus_path = os.path.join(directory, f"documind_{run_name}.prom")
+        trace_path = os.path.join(directory, f"trace_{run_name}.json")
+        self.write_prometheus(prometheus_path)
+        self.write_trace(trace_path)
+        return prometheus_path, trace_path
+
+    def summary(self) -> List[str]:
+        """One human-readable line per stage: calls, mean and bucketed p50/p95 latency."""
+        stages: Dict[str, _Histogram] = {}
+        with self._lock:
+            for (stage, _), hist in self._histograms.items():
+                merged = stages.setdefault(stage, _Histogram())
+                merged.counts = [a + b for a, b in zip(merged.counts, hist.counts)]
+                merged.total += hist.total
+                merged.samples += hist.samples
+        return [
+            f"{stage}: {h.samples} calls, mean {h.total / h.samples * 1000:.1f}ms, "
+            f"p50 <= {h.quantile(0.5) * 1000:.0f}ms, p95 <= {h.quantile(0.95) * 1000:.0f}ms"
+            for stage, h in sorted(stages.items()) if h.samples
+        ]
+
+    def write_prometheus(self, path: str):
+        """Writes all metrics in the Prometheus text exposition format (atomically, for the textfile collector)."""
+        lines = [
+            "# HELP documind_stage_duration_seconds Latency of pipeline stages.",
+            "# TYPE documind_stage_duration_seconds histogram",
+        ]
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        for (stage, labels), hist in histograms:
+            base = (("stage", stage),) + labels
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), hist.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"documind_stage_duration_seconds_bucket{_format_labels(base + (('le', le),))} {cumulative}")
+            lines.append(f"documind_stage_duration_seconds_sum{_format_labels(base)} {hist.total}")
+            lines.append(f"documind_stage_duration_seconds_count{_format_labels(base)} {hist.samples}")
+
+        declared = set()
+        for (name, labels), value in counters:
+            metric = f"documind_{name}" if name.endswith("_total") else f"documind_{name}_total"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+    def write_trace(self, path: str):
+        """Writes recorded spans as a Chrome trace (open in chrome://tracing or Perfetto)."""
+        with self._lock:
+            trace = {
+                "traceEvents": list(self._events),
+                "otherData": {"dropped_events": self._dropped_events},
+            }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+
+_TokenUsageCallback = None
+
+def _token_usage_callback_class():
+    """
+    Defines the LangChain callback class on first use, so modules that only record
+    latencies (e.g. the PDF parser) don't import LangChain.
+    """
+    global _TokenUsageCallback
+    if _TokenUsageCallback is None:
+        from langchain_core.callbacks import BaseCallbackHandler
+
+        class TokenUsageCallback(BaseCallbackHandler):
+            def __init__(self, telemetry: Telemetry, model: str):
+                self.telemetry = telemetry
+                self.model = model
+
+            def on_llm_end(self, response, **kwargs):
+                usage = (response.llm_output or {}).get("token_usage") or {}
+                if not usage:
+                    # Fall back to per-message usage metadata
+                    for generations in response.generations:
+                        for generation in generations:
+                            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                            usage["prompt_tokens"] = usage.get("prompt_tokens", 0) + metadata.get("input_tokens", 0)
+                            usage["completion_tokens"] = usage.get("completion_tokens", 0) + metadata.get("output_tokens", 0)
+                self.telemetry.record_tokens(self.model, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0))
+
+        _TokenUsageCallback = TokenUsageCallback
+    return _TokenUsageCallback
+
+# Process-wide recorder shared by all pipeline components
+telemetry = Telemetry()
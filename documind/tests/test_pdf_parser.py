@@ -0,0 +1,36 @@
+from src.ingestion.pdf_parser import PDFProcessor
+
+# Three pages of Markdown, separated by form feeds
+CONTRACT = (
+    "# ARTICLE 1: TERMS\n\n"
+    "1.1 The Employee shall work forty hours per week.\n\n"
+    "(a) Overtime is paid at 125 percent.\n\n"
+    "(b) Night work is paid at 150 percent.\n"
+    "\f# ARTICLE 2: GOVERNING LAW\n\n"
+    "This Agreement is governed by the laws of the UAE.\n\n"
+    "2.1 The notice period is thirty days and\n"
+    "\fapplies equally to both parties.\n\n"
+    "2.2 Disputes go to the Dubai courts.\n"
+)
+
+def _parse(tmp_path):
+    path = tmp_path / "contract.md"
+    path.write_text(CONTRACT, encoding="utf-8")
+    return PDFProcessor().parse_pdf(str(path))
+
+def test_heading_at_top_of_page_does_not_inherit_previous_clause(tmp_path):
+    chunks = _parse(tmp_path)
+    heading = next(c for c in chunks if c["raw_text"].startswith("# ARTICLE 2"))
+    assert heading["clause_id"] == "General"
+    assert heading["page_no"] == 2
+    assert heading["section"] == "ARTICLE 2: GOVERNING LAW"
+    # The sub-clauses were packed into 1.1, so no chunk carries their IDs
+    assert [c["clause_id"] for c in chunks if c["clause_id"] != "General"] == ["1.1", "2.1", "2.2"]
+
+def test_clause_across_page_break_is_one_chunk(tmp_path):
+    chunks = _parse(tmp_path)
+    clause = next(c for c in chunks if c["clause_id"] == "2.1")
+    assert clause["raw_text"] == "2.1 The notice period is thirty days and\napplies equally to both parties."
+    assert clause.page_no == 2
+    assert clause.end_page == 3
+    assert clause.page_at(clause["raw_text"].index("applies")) == 3